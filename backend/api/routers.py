@@ -1,14 +1,23 @@
 import logging
 import json
+import uuid
+import hashlib
 from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from .util import get_session_store, get_llm_provider
-from session_store.base import SessionStore
+from .util import get_session_store, get_llm_provider, get_ingestion_pool
+from .uploads import (
+    MAX_FORM_BYTES,
+    UploadTooLargeError,
+    receive_multipart_upload,
+)
+from session_store.base import SessionStore, VersionConflictError
 from providers.base import LLMProvider
+from core.config import settings
 
 from domains.chat.models import ChatPayload
 from domains.chat.service import get_chat_response
@@ -21,24 +30,48 @@ from domains.lenses.service import (
 )
 from domains.analysis.models import InteractionPayload
 from domains.analysis.service import get_ai_explanation
+from domains.session.jobs import (
+    IngestionPool,
+    submit_ingestion_job,
+    get_ingestion_job,
+)
+from domains.session.encoding import (
+    CHART_DATA_MEDIA_TYPES,
+    BATCH_CHART_DATA_MEDIA_TYPES,
+    encode_chart_data,
+    encode_chart_data_batch,
+    negotiate_chart_data_media_type,
+)
 from domains.session.service import (
-    create_and_store_session,
+    get_cache_stats,
     get_processed_chart_data,
+    get_processed_chart_data_batch,
+    get_chart_data_version,
+    get_chart_data_range,
     get_session_data,
+    update_session,
+    append_session_items,
     clear_session,
     get_all_preloaded_datasets_from_cache,
-    get_preloaded_dataset_by_id,
+    create_preloaded_session,
+    UPLOAD_DIR,
+    UPLOAD_FILE_SUFFIX,
 )
 from domains.session.models import (
     ChatMessage,
     AnalysisRecord,
+    IngestionJob,
     PreloadedDatasetInfo,
     SessionData,
     ChartDataPayload,
+    ChartDataBatchPayload,
+    ChartDataRangePayload,
     SessionStateUpdatePayload,
 )
 
-MAX_FILE_SIZE = 30 * 1024 * 1024
+MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE_BYTES
+# Room for multipart boundaries, part headers and the text fields
+MAX_FORM_OVERHEAD_BYTES = MAX_FORM_BYTES * 2
 
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
@@ -69,13 +102,9 @@ async def load_preloaded_dataset(
     logging.info(f"Received request to load preloaded dataset: {dataset_id}")
 
     try:
-        data_path, info = get_preloaded_dataset_by_id(dataset_id)
-        with open(data_path, "rb") as f:
-            contents = f.read()
-
         supported_charts = json.loads(supported_charts_json)
-        session_id, session_data = create_and_store_session(
-            session_store, info.description, contents, supported_charts
+        session_id, session_data = await create_preloaded_session(
+            session_store, dataset_id, supported_charts
         )
         logging.info(f"Successfully created session {session_id} from preloaded data")
         return {"session_id": session_id, "data": session_data}
@@ -87,37 +116,68 @@ async def load_preloaded_dataset(
 
 
 # TODO : add some security checks before ingesting file
-@router.post("/upload", response_model=Dict[str, Any])
+@router.post("/upload", response_model=IngestionJob, status_code=202)
 @limiter.limit("5/minute")
 async def upload_dataset(
     request: Request,
-    description: str = Form(...),
-    file: UploadFile = File(...),
-    supported_charts_json: str = Form(...),
     session_store: SessionStore = Depends(get_session_store),
+    ingestion_pool: IngestionPool = Depends(get_ingestion_pool),
 ):
-    logging.info(f"Recieved upload request for file: {file.filename}")
-
-    if not file.size:
-        raise HTTPException(status_code=400, detail="Could not determine file size.")
-
-    if file.size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File size exceeds the limit of {MAX_FILE_SIZE / 1024 / 1024} MB.",
+    """Streams a multipart upload (`description`, `file`, `supported_charts_json`)
+    to disk and schedules it for ingestion."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > MAX_FILE_SIZE + MAX_FORM_OVERHEAD_BYTES:
+            raise HTTPException(status_code=413, detail=_upload_too_large_detail())
+
+    upload_path = UPLOAD_DIR / f"{uuid.uuid4()}{UPLOAD_FILE_SUFFIX}"
+    try:
+        form = await receive_multipart_upload(
+            request, "file", upload_path, MAX_FILE_SIZE
         )
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail=_upload_too_large_detail())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logging.info(f"Recieved upload of {upload_path.stat().st_size} bytes")
 
     try:
-        contents = await file.read()
-        supported_charts = json.loads(supported_charts_json)
-        session_id, session_data = create_and_store_session(
-            session_store, description, contents, supported_charts
+        description = form["description"]
+        supported_charts = json.loads(form["supported_charts_json"])
+    except KeyError as e:
+        upload_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"Missing form field {e}")
+    except json.JSONDecodeError as e:
+        upload_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=400, detail=f"Invalid supported_charts_json: {e}"
         )
-        logging.info(f"Successfully created session {session_id}")
-        return {"session_id": session_id, "data": session_data}
-    except Exception as e:
-        logging.error(f"Failed to process file upload: {e}", exc_info=True)
-        raise HTTPException(status_code=400, detail=f"Failed to process file: {e}")
+
+    return await submit_ingestion_job(
+        session_store,
+        ingestion_pool,
+        description,
+        upload_path,
+        supported_charts,
+        delete_source=True,
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_job_status(
+    request: Request,
+    job_id: str,
+    session_store: SessionStore = Depends(get_session_store),
+):
+    """Returns the status of an ingestion job, with the session once it completes."""
+    job = await get_ingestion_job(session_store, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _upload_too_large_detail() -> str:
+    return f"File size exceeds the limit of {MAX_FILE_SIZE / 1024 / 1024} MB."
 
 
 @router.post("/session/state", response_model=SessionData)
@@ -128,17 +188,20 @@ async def update_session_state(
 ):
     """Updates the state of a given session (e.g., current step, chart selection)."""
     logging.info(f"Updating state for session {payload.session_id}")
-    session_data = get_session_data(session_store, payload.session_id)
-    if not session_data:
-        raise HTTPException(status_code=404, detail="Session not found")
-    logging.debug(f"Previous:\n{session_data}")
 
     # Update fields if they are provided in the payload
     update_data = payload.model_dump(exclude_unset=True, exclude={"session_id"})
-    session_data = session_data.model_copy(update=update_data)
+    try:
+        session_data = await update_session(
+            session_store, payload.session_id, lambda _: update_data
+        )
+    except VersionConflictError:
+        raise HTTPException(
+            status_code=409, detail="Session is being modified, please retry"
+        )
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
     logging.debug(f"New:\n{session_data}")
-
-    session_store.save_data(payload.session_id, session_data.model_dump_json())
     logging.debug(f"Successfully updated session state for {payload.session_id}")
     return session_data
 
@@ -152,7 +215,7 @@ async def chat_with_assistant(
     llm_provider: LLMProvider = Depends(get_llm_provider),
 ):
     logging.info(f"Received chat message for session {payload.session_id}")
-    session_data = get_session_data(session_store, payload.session_id)
+    session_data = await get_session_data(session_store, payload.session_id)
     if not session_data:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -175,12 +238,15 @@ async def chat_with_assistant(
 
             user_msg = ChatMessage(role="user", content=payload.message)
             logging.debug(f"New user message:\n{user_msg}")
-            session_data.chat_history.append(user_msg)
             assistant_msg = ChatMessage(role="assistant", content=full_response)
             logging.debug(f"New assistant message:\n{assistant_msg}")
-            session_data.chat_history.append(assistant_msg)
 
-            session_store.save_data(payload.session_id, session_data.model_dump_json())
+            await append_session_items(
+                session_store,
+                payload.session_id,
+                "chat_history",
+                [user_msg, assistant_msg],
+            )
             logging.info(
                 f"Finished streaming and saved history for session {payload.session_id}"
             )
@@ -206,7 +272,7 @@ async def analyze_interaction(
     llm_provider: LLMProvider = Depends(get_llm_provider),
 ):
     logging.info(f"Received request for tool '{payload.tool}'")
-    session_data = get_session_data(session_store, payload.session_id)
+    session_data = await get_session_data(session_store, payload.session_id)
     if not session_data:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -225,8 +291,9 @@ async def analyze_interaction(
             correctness=correctness,
         )
         logging.debug(f"New analysis record:\n{analysis_record}")
-        session_data.analysis_log.append(analysis_record)
-        session_store.save_data(payload.session_id, session_data.model_dump_json())
+        await append_session_items(
+            session_store, payload.session_id, "analysis_log", [analysis_record]
+        )
 
         return {"explanation": explanation, "correctness": correctness}
 
@@ -259,28 +326,140 @@ async def list_lenses(request: Request):
 
 @router.post("/chart-data")
 async def get_chart_data(
-    payload: ChartDataPayload, session_store: SessionStore = Depends(get_session_store)
+    request: Request,
+    payload: ChartDataPayload,
+    session_store: SessionStore = Depends(get_session_store),
 ):
-    """Processes and returns chart data based on user selections."""
-    session_data = get_session_data(session_store, payload.session_id)
+    """Processes and returns chart data based on user selections.
+
+    The encoding is negotiated from the Accept header: Arrow IPC stream,
+    column-oriented JSON, or row-oriented JSON by default. Responses carry an ETag
+    derived from the request, dataset version and encoding, so a client sending it
+    back in If-None-Match gets a 304 without any processing.
+    """
+    session_data = await get_session_data(session_store, payload.session_id)
     if not session_data:
         raise HTTPException(status_code=404, detail="Session not found")
 
     try:
-        chart_data = get_processed_chart_data(
+        media_type = negotiate_chart_data_media_type(request.headers.get("accept"))
+        version = get_chart_data_version(session_data, payload)
+        etag = f'"{version}-{CHART_DATA_MEDIA_TYPES.index(media_type)}"'
+        headers = {"ETag": etag, "Vary": "Accept"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        chart_df = await run_in_threadpool(
+            get_processed_chart_data, session_data, payload
+        )
+        return Response(
+            content=encode_chart_data(chart_df, media_type),
+            media_type=media_type,
+            headers=headers,
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Failed to get chart data: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to process chart data")
+
+
+@router.post("/chart-data/batch")
+async def get_chart_data_batch(
+    request: Request,
+    payload: ChartDataBatchPayload,
+    session_store: SessionStore = Depends(get_session_store),
+):
+    """Processes and returns chart data for several chart specs at once.
+
+    The session is looked up and the dataset loaded once, and every uncached
+    chart is evaluated in a single polars query plan. The response is a JSON
+    array with one entry per spec, in request order, each encoded as
+    `/chart-data` would encode it. Arrow is not offered for batches.
+    """
+    session_data = await get_session_data(session_store, payload.session_id)
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    try:
+        media_type = negotiate_chart_data_media_type(
+            request.headers.get("accept"), BATCH_CHART_DATA_MEDIA_TYPES
+        )
+        versions = [
+            get_chart_data_version(session_data, spec) for spec in payload.charts
+        ]
+        batch_version = hashlib.sha256(",".join(versions).encode()).hexdigest()
+        etag = f'"{batch_version}-{CHART_DATA_MEDIA_TYPES.index(media_type)}"'
+        headers = {"ETag": etag, "Vary": "Accept"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        chart_dfs = await run_in_threadpool(
+            get_processed_chart_data_batch, session_data, payload.charts
+        )
+        return Response(
+            content=encode_chart_data_batch(chart_dfs, media_type),
+            media_type=media_type,
+            headers=headers,
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Failed to get batch chart data: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to process chart data")
+
+
+@router.post("/chart-data/range")
+async def get_chart_data_for_range(
+    request: Request,
+    payload: ChartDataRangePayload,
+    session_store: SessionStore = Depends(get_session_store),
+):
+    """Returns chart data for an x range, for zooming and panning.
+
+    Answered from a pre-bucketed pyramid of the dataset, built by the first range
+    request for a mapping and cached after that. Each row carries the bucket mean
+    as `y` along with `y_min`, `y_max` and `count`. Uses the same content
+    negotiation as `/chart-data`.
+    """
+    session_data = await get_session_data(session_store, payload.session_id)
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    try:
+        media_type = negotiate_chart_data_media_type(request.headers.get("accept"))
+        chart_df = await run_in_threadpool(
+            get_chart_data_range,
             session_data,
             payload.chart_type,
             payload.mapping,
-            payload.aggregation_method,
-            payload.sampling_method,
+            payload.x_start,
+            payload.x_end,
+            payload.target_points,
+        )
+        return Response(
+            content=encode_chart_data(chart_df, media_type),
+            media_type=media_type,
+            headers={"Vary": "Accept"},
         )
-        return chart_data
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logging.error(f"Failed to get chart data: {e}", exc_info=True)
+        logging.error(f"Failed to get chart data for range: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process chart data")
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Checks an If-None-Match header against an ETag, ignoring weak prefixes."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+
 @router.get("/session/{session_id}", response_model=SessionData)
 async def get_session(
     request: Request,
@@ -289,7 +468,7 @@ async def get_session(
 ):
     """Retrieves the data for a given session ID."""
     logging.debug(f"Attempting to retrieve session {session_id}")
-    session_data = get_session_data(session_store, session_id)
+    session_data = await get_session_data(session_store, session_id)
     if not session_data:
         raise HTTPException(status_code=404, detail="Session not found")
     return session_data
@@ -307,8 +486,14 @@ async def reset_session(
         raise HTTPException(status_code=400, detail="session_id is required.")
 
     try:
-        clear_session(session_store, session_id)
+        await clear_session(session_store, session_id)
         return {"message": f"Session {session_id} has been reset."}
     except Exception as e:
         logging.error(f"Failed to reset session {session_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to reset session.")
+
+
+@router.get("/cache/stats", response_model=Dict[str, Dict[str, int]])
+async def cache_stats(request: Request):
+    """Returns hit/miss counters and usage of the serving worker's caches."""
+    return get_cache_stats()
@@ -0,0 +1,148 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Cap on all part headers and non-file form fields together, which only carry
+# short text and JSON
+MAX_FORM_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class _PartCollector:
+    """Turns multipart parser callbacks into a queue of part events that can be
+    handled asynchronously between parser writes."""
+
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, ...]] = []
+        self.header_bytes = 0
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers: Dict[bytes, bytes] = {}
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+        self.header_bytes += end - start
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+        self.header_bytes += end - start
+
+    def on_header_end(self) -> None:
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(
+            self._headers.get(b"content-disposition", b"")
+        )
+        if b"name" not in options:
+            raise ValueError("Multipart part is missing a field name")
+        filename = options.get(b"filename")
+        self.events.append(
+            (
+                "begin",
+                options[b"name"].decode(),
+                filename.decode() if filename is not None else None,
+            )
+        )
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self.events.append(("data", bytes(data[start:end])))
+
+    def on_part_end(self) -> None:
+        self.events.append(("end",))
+
+    def callbacks(self) -> Dict[str, object]:
+        return {
+            name: getattr(self, name)
+            for name in (
+                "on_part_begin",
+                "on_header_field",
+                "on_header_value",
+                "on_header_end",
+                "on_headers_finished",
+                "on_part_data",
+                "on_part_end",
+            )
+        }
+
+
+async def receive_multipart_upload(
+    request: Request, file_field: str, upload_path: Path, max_file_bytes: int
+) -> Dict[str, str]:
+    """Parses a multipart/form-data body as it arrives from the client.
+
+    The `file_field` part is written straight to `upload_path` and rejected with
+    an `UploadTooLargeError` as soon as it passes `max_file_bytes`, so the body
+    is never buffered in memory or spooled to disk first. Returns the remaining
+    text fields. Raises a ValueError for a malformed body, a missing or empty
+    file, or form fields that aren't UTF-8 or together pass `MAX_FORM_BYTES`,
+    and removes `upload_path` whenever it raises.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise ValueError("Expected a multipart/form-data body")
+
+    collector = _PartCollector()
+    parser = MultipartParser(options[b"boundary"], collector.callbacks())
+    fields: Dict[str, bytearray] = {}
+    current: Optional[str] = None
+    file_bytes = 0
+    form_bytes = 0
+    out = None
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for event in collector.events:
+                match event:
+                    case ("begin", name, filename):
+                        current = name
+                        if name == file_field and filename is not None:
+                            if out is not None:
+                                raise ValueError(f"Multiple '{file_field}' parts")
+                            out = await run_in_threadpool(open, upload_path, "wb")
+                        else:
+                            fields[name] = bytearray()
+                    case ("data", data) if current == file_field and out is not None:
+                        file_bytes += len(data)
+                        if file_bytes > max_file_bytes:
+                            raise UploadTooLargeError(
+                                f"File size exceeds the limit of "
+                                f"{max_file_bytes / 1024 / 1024} MB."
+                            )
+                        await run_in_threadpool(out.write, data)
+                    case ("data", data):
+                        fields[current] += data
+                        form_bytes += len(data)
+                    case ("end",):
+                        current = None
+            collector.events.clear()
+            if form_bytes + collector.header_bytes > MAX_FORM_BYTES:
+                raise ValueError("Form fields are too large")
+        parser.finalize()
+
+        if out is None:
+            raise ValueError(f"Missing '{file_field}' file")
+        if file_bytes == 0:
+            raise ValueError("Uploaded file is empty.")
+        try:
+            form = {name: value.decode() for name, value in fields.items()}
+        except UnicodeDecodeError:
+            raise ValueError("Form fields must be UTF-8 text")
+    except BaseException:
+        if out is not None:
+            out.close()
+        upload_path.unlink(missing_ok=True)
+        raise
+    out.close()
+
+    return form
@@ -1,6 +1,7 @@
 from fastapi import Request
 from session_store.base import SessionStore
 from providers.base import LLMProvider
+from domains.session.jobs import IngestionPool
 
 
 def get_session_store(request: Request) -> SessionStore:
@@ -9,3 +10,7 @@ def get_session_store(request: Request) -> SessionStore:
 
 def get_llm_provider(request: Request) -> LLMProvider:
     return request.app.state.llm_provider
+
+
+def get_ingestion_pool(request: Request) -> IngestionPool:
+    return request.app.state.ingestion_pool
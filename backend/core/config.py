@@ -12,6 +12,22 @@ class Settings(BaseSettings):
     API_SOURCE: str = "openai"
     SESSION_STORE_TYPE: str = "memory"
     REDIS_URL: str = "redis://localhost"
+    REDIS_MAX_CONNECTIONS: int = 32
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5.0
+    SESSION_COMPRESSION_MIN_BYTES: int = 1024
+    SESSION_COMPRESSION_LEVEL: int = 3
+    MAX_UPLOAD_SIZE_BYTES: int = 100 * 1024 * 1024
+    DATAFRAME_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    CHART_DATA_CACHE_MAX_ENTRIES: int = 512
+    CHART_PYRAMID_CACHE_MAX_BYTES: int = 128 * 1024 * 1024
+    SAMPLE_INDEX_CACHE_MAX_ENTRIES: int = 256
+    SAMPLING_SEED: int = 0
+    SESSION_CACHE_MAX_ENTRIES: int = 1024
+    SESSION_UPDATE_MAX_ATTEMPTS: int = 5
+    INGESTION_MAX_WORKERS: int = 2
+    CATEGORICAL_MAX_UNIQUE: int = 1_000
+    PROFILE_MODE: Literal["exact", "approximate"] = "approximate"
+    PROFILE_SAMPLE_SIZE: int = 100_000
 
 
 settings = Settings()
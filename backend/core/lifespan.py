@@ -5,7 +5,12 @@ from fastapi import FastAPI
 from . import logger
 from core.config import settings
 from domains.lenses.service import load_lenses_into_cache
-from domains.session.service import initialize_session_store, load_preloaded_datasets_into_cache
+from domains.session.service import (
+    initialize_session_store,
+    load_preloaded_datasets_into_cache,
+    build_preloaded_datasets,
+)
+from domains.session.jobs import initialize_ingestion_pool
 from domains.analysis.service import initialize_llm_provider
 
 
@@ -17,10 +22,14 @@ async def lifespan(app: FastAPI):
 
     app.state.session_store = initialize_session_store()
     app.state.llm_provider = initialize_llm_provider()
+    app.state.ingestion_pool = initialize_ingestion_pool()
 
     load_lenses_into_cache()
     load_preloaded_datasets_into_cache()
+    build_preloaded_datasets()
 
     logging.info("Application startup complete")
     yield
     logging.info("Application shutting down...")
+    app.state.ingestion_pool.shutdown(wait=False, cancel_futures=True)
+    await app.state.session_store.close()
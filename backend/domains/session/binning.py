@@ -0,0 +1,59 @@
+from typing import Optional
+import polars as pl
+
+BIN_2D_VALUE_COL = "value"
+
+
+def _bin_center(col: str, grid_size: int) -> pl.Expr:
+    """Snaps a numeric column to the center of its cell on an equal-width grid
+    spanning the column's range."""
+    x = pl.col(col).cast(pl.Float64)
+    lower = x.min()
+    width = (x.max() - lower) / grid_size
+    cell = ((x - lower) / width).floor().fill_nan(0).clip(0, grid_size - 1)
+    # A constant column has zero width, so every row lands on its single value
+    return pl.when(width > 0).then(lower + (cell + 0.5) * width).otherwise(lower)
+
+
+def bin_2d(
+    lf: pl.LazyFrame,
+    x_col: str,
+    y_col: str,
+    grid_size: int,
+    value_col: Optional[str] = None,
+) -> pl.LazyFrame:
+    """Bins numeric x/y columns into a `grid_size` x `grid_size` grid.
+
+    Returns one row per non-empty cell with the cell center in `x_col`/`y_col`
+    and, in a `value` column, the number of rows in the cell, or the mean of
+    `value_col` when one is given. The result has at most `grid_size ** 2` rows
+    however large the input is.
+    """
+    if x_col == y_col:
+        raise ValueError("2D binning needs different `x` and `y` columns")
+    if BIN_2D_VALUE_COL in (x_col, y_col):
+        raise ValueError(
+            f"2D binning writes cell values to a '{BIN_2D_VALUE_COL}' column, so "
+            f"neither axis can be named '{BIN_2D_VALUE_COL}'"
+        )
+
+    schema = lf.collect_schema()
+    for col in [x_col, y_col]:
+        if not schema[col].is_numeric():
+            raise ValueError(f"Column '{col}' must be numeric for 2D binning")
+
+    if value_col is None:
+        cell_value = pl.len().cast(pl.Float64)
+    else:
+        cell_value = pl.col(value_col).cast(pl.Float64).mean()
+
+    return (
+        lf.drop_nulls([x_col, y_col])
+        .with_columns(
+            _bin_center(x_col, grid_size).alias(x_col),
+            _bin_center(y_col, grid_size).alias(y_col),
+        )
+        .group_by([x_col, y_col])
+        .agg(cell_value.alias(BIN_2D_VALUE_COL))
+        .sort([x_col, y_col])
+    )
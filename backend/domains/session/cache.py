@@ -0,0 +1,71 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+from cachetools import LRUCache
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CountedLRUCache(Generic[K, V]):
+    """Process-local, thread-safe LRU cache that counts hits and misses.
+
+    The cache holds at most `max_size` entries, or, when `getsizeof` is given,
+    entries whose sizes add up to at most `max_size` (e.g. estimated bytes). A
+    `max_size` of 0 disables caching.
+    """
+
+    def __init__(
+        self, max_size: int, getsizeof: Optional[Callable[[V], int]] = None
+    ) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache: LRUCache[K, V] = LRUCache(
+            maxsize=max(max_size, 1), getsizeof=getsizeof
+        )
+
+    def get(self, key: K) -> V | None:
+        """Returns the cached value for a key, if any."""
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Caches a value, evicting least recently used entries to stay in budget."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            try:
+                self._cache[key] = value
+            except ValueError:
+                logging.debug(f"Value for {key} exceeds the cache budget, not caching")
+
+    def discard(self, predicate: Callable[[K], bool]) -> None:
+        """Drops every entry whose key matches the predicate."""
+        with self._lock:
+            for key in [k for k in self._cache.keys() if predicate(k)]:
+                del self._cache[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._cache),
+                "size": int(self._cache.currsize),
+                "max_size": self.max_size,
+            }
+
+
+def file_version_key(file_path: Path) -> Tuple[str, int]:
+    """Keys a file by path and modification time, so a rewritten file is never
+    served stale."""
+    return (str(file_path), file_path.stat().st_mtime_ns)
@@ -0,0 +1,132 @@
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+from domains.session.models import DatasetProfile
+
+DATASET_DIR = Path(__file__).parents[2] / "temp_uploads" / "datasets"
+DATASET_DIR.mkdir(parents=True, exist_ok=True)
+DATASET_FILE_SUFFIX = ".arrow"
+PARTIALS_DIR_SUFFIX = ".partials"
+HASH_CHUNK_SIZE = 1024 * 1024
+PINNED_REF_PREFIX = "pinned-"
+
+
+def hash_file(path: Path) -> str:
+    """Returns the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_dataset_path(content_hash: str) -> Path:
+    """Returns the path of the shared Arrow file for a dataset."""
+    return DATASET_DIR / f"{content_hash}{DATASET_FILE_SUFFIX}"
+
+
+def get_partials_dir(dataset_path: Path) -> Path:
+    """Returns the directory holding a dataset file's precomputed partials."""
+    return dataset_path.with_suffix(PARTIALS_DIR_SUFFIX)
+
+
+def _get_profile_path(content_hash: str) -> Path:
+    return DATASET_DIR / f"{content_hash}.profile.json"
+
+
+def _get_refs_dir(content_hash: str) -> Path:
+    return DATASET_DIR / f"{content_hash}.refs"
+
+
+def _get_lock_path(content_hash: str) -> Path:
+    return DATASET_DIR / f"{content_hash}.lock"
+
+
+@contextmanager
+def _dataset_lock(content_hash: str) -> Iterator[None]:
+    """Serializes work on a single dataset across threads and processes.
+
+    The lock file is removed along with its dataset, so a lock taken on a file
+    that was unlinked while waiting is dropped and taken again on the current one.
+    """
+    lock_path = _get_lock_path(content_hash)
+    while True:
+        lock_file = open(lock_path, "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        lock_file.close()
+
+    try:
+        yield
+    finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+
+def acquire_dataset(
+    content_hash: str,
+    session_id: str,
+    build: Callable[[Path], DatasetProfile],
+) -> Tuple[Path, DatasetProfile]:
+    """Registers a session as a user of a dataset, building it on first use.
+
+    `build` is only called when no other session has already stored this content.
+    It must write the dataset's Arrow file to the path it is given and return the
+    dataset profile, which is then shared by every later session. References whose
+    id starts with `PINNED_REF_PREFIX` are never released or expired.
+    """
+    dataset_path = get_dataset_path(content_hash)
+    profile_path = _get_profile_path(content_hash)
+    refs_dir = _get_refs_dir(content_hash)
+
+    with _dataset_lock(content_hash):
+        if dataset_path.exists() and profile_path.exists():
+            logging.info(f"Reusing stored dataset {content_hash}")
+            profile = DatasetProfile.model_validate_json(profile_path.read_text())
+        else:
+            logging.info(f"Building dataset {content_hash}")
+            try:
+                profile = build(dataset_path)
+            except Exception:
+                dataset_path.unlink(missing_ok=True)
+                shutil.rmtree(get_partials_dir(dataset_path), ignore_errors=True)
+                raise
+            profile_path.write_text(profile.model_dump_json())
+
+        refs_dir.mkdir(exist_ok=True)
+        (refs_dir / session_id).touch()
+
+    return dataset_path, profile
+
+
+def release_dataset(content_hash: str, session_id: str) -> bool:
+    """Drops a session's reference to a dataset, deleting the dataset once no
+    session refers to it. Returns True if the dataset was deleted.
+    """
+    refs_dir = _get_refs_dir(content_hash)
+
+    with _dataset_lock(content_hash):
+        (refs_dir / session_id).unlink(missing_ok=True)
+        if refs_dir.exists() and any(refs_dir.iterdir()):
+            return False
+
+        dataset_path = get_dataset_path(content_hash)
+        dataset_path.unlink(missing_ok=True)
+        shutil.rmtree(get_partials_dir(dataset_path), ignore_errors=True)
+        _get_profile_path(content_hash).unlink(missing_ok=True)
+        shutil.rmtree(refs_dir, ignore_errors=True)
+        # Safe while held, waiters notice the file is gone and lock a new one
+        _get_lock_path(content_hash).unlink(missing_ok=True)
+
+    logging.info(f"Removed unreferenced dataset {content_hash}")
+    return True
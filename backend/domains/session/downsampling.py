@@ -0,0 +1,115 @@
+import polars as pl
+
+_INDEX_COL = "__row_index"
+_BUCKET_COL = "__bucket"
+_BUCKET_INDEX_COL = "__bucket_row"
+_AREA_COL = "__area"
+
+
+def _x_coordinate(lf: pl.LazyFrame, x_col: str) -> pl.Expr:
+    """Returns a numeric x coordinate, using row position for non-numeric axes."""
+    dtype = lf.collect_schema()[x_col]
+    if dtype.is_numeric() or dtype.is_temporal():
+        return pl.col(x_col).to_physical().cast(pl.Float64)
+    return pl.col(_INDEX_COL).cast(pl.Float64)
+
+
+def min_max_downsample(
+    lf: pl.LazyFrame, x_col: str, y_col: str, target_size: int
+) -> pl.LazyFrame:
+    """Keeps the minimum and maximum y of each of `target_size / 2` x-ordered
+    buckets, so peaks and troughs survive. Frames already within `target_size`
+    rows keep every row. The result is always sorted by x.
+    """
+    bucket_count = max(1, target_size // 2)
+    within_target = pl.len() <= target_size
+    bucket_row = pl.int_range(pl.len()).over(_BUCKET_COL)
+
+    return (
+        lf.sort(x_col, nulls_last=True)
+        .with_columns(
+            (pl.int_range(pl.len()) * bucket_count // pl.len()).alias(_BUCKET_COL)
+        )
+        .filter(
+            within_target
+            | (bucket_row == pl.col(y_col).arg_min().over(_BUCKET_COL))
+            | (bucket_row == pl.col(y_col).arg_max().over(_BUCKET_COL))
+        )
+        .drop(_BUCKET_COL)
+    )
+
+
+def lttb_downsample(
+    lf: pl.LazyFrame, x_col: str, y_col: str, target_size: int
+) -> pl.LazyFrame:
+    """Largest-Triangle-Three-Buckets downsampling to `target_size` points.
+
+    Classic LTTB anchors each triangle on the point picked in the previous bucket,
+    which forces a sequential scan. This variant anchors on the previous bucket's
+    average instead, so every bucket is solved at once with window expressions.
+    The first and last points are always kept, frames already within
+    `target_size` rows keep every row, and the result is always sorted by x.
+    """
+    if target_size < 3:
+        return min_max_downsample(lf, x_col, y_col, target_size)
+
+    inner_buckets = target_size - 2
+    within_target = pl.len() <= target_size
+    row_index = pl.col(_INDEX_COL)
+
+    # First and last rows get buckets of their own, the rest are split evenly
+    bucketed_lf = (
+        lf.sort(x_col, nulls_last=True)
+        .with_row_index(_INDEX_COL)
+        .with_columns(
+            pl.when(row_index == 0)
+            .then(0)
+            .when(row_index == pl.len() - 1)
+            .then(inner_buckets + 1)
+            .otherwise(
+                (row_index - 1) * inner_buckets // (pl.len() - 2).clip(lower_bound=1)
+                + 1
+            )
+            .cast(pl.Int64)
+            .alias(_BUCKET_COL)
+        )
+        .with_columns(_x_coordinate(lf, x_col).alias("__x"))
+    )
+
+    bucket_means = bucketed_lf.group_by(_BUCKET_COL).agg(
+        pl.col("__x").mean().alias("__mean_x"),
+        pl.col(y_col).cast(pl.Float64).mean().alias("__mean_y"),
+    )
+    previous_means = bucket_means.select(
+        (pl.col(_BUCKET_COL) + 1).alias(_BUCKET_COL),
+        pl.col("__mean_x").alias("__prev_x"),
+        pl.col("__mean_y").alias("__prev_y"),
+    )
+    next_means = bucket_means.select(
+        (pl.col(_BUCKET_COL) - 1).alias(_BUCKET_COL),
+        pl.col("__mean_x").alias("__next_x"),
+        pl.col("__mean_y").alias("__next_y"),
+    )
+
+    ax, ay = pl.col("__prev_x"), pl.col("__prev_y")
+    bx, by = pl.col("__x"), pl.col(y_col).cast(pl.Float64)
+    cx, cy = pl.col("__next_x"), pl.col("__next_y")
+    area = ((ax - cx) * (by - ay) - (ax - bx) * (cy - ay)).abs()
+
+    return (
+        bucketed_lf.join(previous_means, on=_BUCKET_COL, how="left")
+        .join(next_means, on=_BUCKET_COL, how="left")
+        .sort(_INDEX_COL)
+        .with_columns(
+            area.fill_null(0.0).alias(_AREA_COL),
+            pl.int_range(pl.len()).over(_BUCKET_COL).alias(_BUCKET_INDEX_COL),
+        )
+        .filter(
+            within_target
+            | (
+                pl.col(_BUCKET_INDEX_COL)
+                == pl.col(_AREA_COL).arg_max().over(_BUCKET_COL)
+            )
+        )
+        .select(lf.collect_schema().names())
+    )
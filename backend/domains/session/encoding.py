@@ -0,0 +1,59 @@
+from io import BytesIO
+from typing import List
+import polars as pl
+
+ROWS_JSON_MEDIA_TYPE = "application/json"
+COLUMNS_JSON_MEDIA_TYPE = "application/vnd.datalens.columns+json"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Ordered by preference when a client accepts more than one
+CHART_DATA_MEDIA_TYPES = [
+    ARROW_STREAM_MEDIA_TYPE,
+    COLUMNS_JSON_MEDIA_TYPE,
+    ROWS_JSON_MEDIA_TYPE,
+]
+
+
+# Batches are JSON arrays with one entry per chart, so Arrow is not offered
+BATCH_CHART_DATA_MEDIA_TYPES = [
+    COLUMNS_JSON_MEDIA_TYPE,
+    ROWS_JSON_MEDIA_TYPE,
+]
+
+
+def negotiate_chart_data_media_type(
+    accept: str | None, media_types: List[str] = CHART_DATA_MEDIA_TYPES
+) -> str:
+    """Picks the chart data encoding from an Accept header, falling back to
+    row-oriented JSON."""
+    if not accept:
+        return ROWS_JSON_MEDIA_TYPE
+
+    accepted = {part.split(";")[0].strip().lower() for part in accept.split(",")}
+    for media_type in media_types:
+        if media_type in accepted:
+            return media_type
+    return ROWS_JSON_MEDIA_TYPE
+
+
+def encode_chart_data(df: pl.DataFrame, media_type: str) -> bytes:
+    """Serializes a processed chart dataframe straight from its column buffers.
+
+    - Arrow IPC stream for clients that can read Arrow directly
+    - Column-oriented JSON, `{"x": [...], "y": [...]}`
+    - Row-oriented JSON, `[{"x": ..., "y": ...}, ...]`, the default
+    """
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        buffer = BytesIO()
+        df.write_ipc_stream(buffer)
+        return buffer.getvalue()
+    if media_type == COLUMNS_JSON_MEDIA_TYPE:
+        # Imploding gives a single row of lists, written as a one element array
+        return df.select(pl.all().implode()).write_json()[1:-1].encode()
+    return df.write_json().encode()
+
+
+def encode_chart_data_batch(dfs: List[pl.DataFrame], media_type: str) -> bytes:
+    """Serializes several processed chart dataframes as one JSON array, each
+    entry encoded as `encode_chart_data` would encode it on its own."""
+    return b"[" + b",".join(encode_chart_data(df, media_type) for df in dfs) + b"]"
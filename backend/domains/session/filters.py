@@ -0,0 +1,109 @@
+from datetime import date, datetime, time
+from typing import Any, List, Optional
+import polars as pl
+
+from domains.session.models import ChartFilter
+
+_COMPARISON_OPS = {
+    "eq": lambda col, value: col == value,
+    "ne": lambda col, value: col != value,
+    "lt": lambda col, value: col < value,
+    "lte": lambda col, value: col <= value,
+    "gt": lambda col, value: col > value,
+    "gte": lambda col, value: col >= value,
+}
+
+_ISO_PARSERS = {
+    pl.Datetime: datetime.fromisoformat,
+    pl.Date: date.fromisoformat,
+    pl.Time: time.fromisoformat,
+}
+
+
+def _coerce_value(value: Any, name: str, dtype: pl.DataType) -> Any:
+    """Converts a JSON filter value to a Python value comparable with a column.
+
+    Dates, datetimes and times arrive as ISO 8601 strings. Every other value must
+    already have the JSON type matching the column, so a mismatch is reported as
+    a bad filter rather than failing inside polars.
+    """
+    if value is None:
+        raise ValueError(f"Filter on '{name}' needs a value")
+
+    parse = _ISO_PARSERS.get(dtype.base_type())
+    if parse is not None:
+        if isinstance(value, str):
+            try:
+                return parse(value)
+            except ValueError:
+                pass
+        kind = dtype.base_type().__name__.lower()
+        raise ValueError(f"Filter value '{value}' on '{name}' is not an ISO {kind}")
+
+    if dtype.is_numeric():
+        expected, valid = "a number", (
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+    elif dtype == pl.Boolean:
+        expected, valid = "true or false", isinstance(value, bool)
+    elif dtype in (pl.String, pl.Categorical, pl.Enum):
+        expected, valid = "a string", isinstance(value, str)
+    else:
+        raise ValueError(f"Filtering on '{name}' ({dtype}) is not supported")
+
+    if not valid:
+        raise ValueError(f"Filter on '{name}' expects {expected}, got '{value}'")
+    return value
+
+
+def _compile_filter(chart_filter: ChartFilter, schema: pl.Schema) -> pl.Expr:
+    name = chart_filter.column
+    if name not in schema:
+        raise ValueError(f"Filter column '{name}' not found in dataset")
+
+    col = pl.col(name)
+    dtype = schema[name]
+    value = chart_filter.value
+    op = chart_filter.op
+
+    if op == "is_null":
+        return col.is_null()
+    if op == "not_null":
+        return col.is_not_null()
+
+    if op in ("in", "not_in", "between"):
+        if not isinstance(value, list):
+            raise ValueError(f"Filter `{op}` on '{name}' expects a list of values")
+        values = [_coerce_value(v, name, dtype) for v in value]
+        if op == "between":
+            if len(values) != 2:
+                raise ValueError(
+                    f"Filter `between` on '{name}' expects [lower, upper] bounds"
+                )
+            return col.is_between(pl.lit(values[0]), pl.lit(values[1]), closed="both")
+        if dtype.is_float() or (
+            dtype.is_numeric() and any(isinstance(v, float) for v in values)
+        ):
+            # is_in needs matching types, so float columns and lists compare as floats
+            matches = col.cast(pl.Float64).is_in([float(v) for v in values])
+        else:
+            matches = col.is_in(values)
+        return matches if op == "in" else ~matches
+
+    if isinstance(value, list):
+        raise ValueError(f"Filter `{op}` on '{name}' expects a single value")
+    return _COMPARISON_OPS[op](col, _coerce_value(value, name, dtype))
+
+
+def compile_filters(filters: List[ChartFilter], schema: pl.Schema) -> Optional[pl.Expr]:
+    """Compiles chart filters into a single polars predicate, ANDing them together.
+
+    Raises a ValueError naming the offending filter when a column is missing or
+    a value doesn't fit the operator or column type. Returns None when there is
+    nothing to filter.
+    """
+    predicate: Optional[pl.Expr] = None
+    for chart_filter in filters:
+        expr = _compile_filter(chart_filter, schema)
+        predicate = expr if predicate is None else predicate & expr
+    return predicate
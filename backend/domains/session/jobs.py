@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set
+
+from domains.session.models import IngestionJob
+from domains.session.service import ingest_dataset, save_new_session, get_session_data
+from session_store.base import SessionStore
+from core.config import settings
+
+JOB_KEY_PREFIX = "ingestion_job:"
+_BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+
+def _create_executor() -> ProcessPoolExecutor:
+    # Workers are spawned rather than forked since polars' thread pool is not
+    # fork-safe
+    return ProcessPoolExecutor(
+        max_workers=settings.INGESTION_MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+class IngestionPool:
+    """Process pool for dataset ingestion that replaces itself when broken.
+
+    A worker that dies abruptly (e.g. killed for running out of memory) leaves a
+    `ProcessPoolExecutor` unusable for good, so the executor is rebuilt and only
+    the jobs that were running on it fail.
+    """
+
+    def __init__(self) -> None:
+        self._executor = _create_executor()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Jobs that failed on the same executor only rebuild it once
+            if self._executor is executor:
+                logging.warning("Ingestion pool is broken, starting a new one")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = _create_executor()
+            raise
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def initialize_ingestion_pool() -> IngestionPool:
+    """Initializes the process pool used for dataset ingestion."""
+    return IngestionPool()
+
+
+async def _save_job(session_store: SessionStore, job: IngestionJob) -> None:
+    await session_store.save_data(
+        f"{JOB_KEY_PREFIX}{job.job_id}", job.model_dump_json(exclude={"data"})
+    )
+
+
+async def submit_ingestion_job(
+    session_store: SessionStore,
+    pool: IngestionPool,
+    description: str,
+    source_path: Path,
+    supported_charts: List[Dict[str, Any]],
+    delete_source: bool = False,
+) -> IngestionJob:
+    """Schedules a dataset for ingestion and returns the pending job right away.
+
+    Job records live in the session store so any worker can answer status polls.
+    """
+    job = IngestionJob(job_id=str(uuid.uuid4()), status="pending")
+    await _save_job(session_store, job)
+
+    task = asyncio.create_task(
+        _run_ingestion_job(
+            session_store,
+            pool,
+            job,
+            description,
+            source_path,
+            supported_charts,
+            delete_source,
+        )
+    )
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+    logging.info(f"Submitted ingestion job {job.job_id}")
+    return job
+
+
+async def _run_ingestion_job(
+    session_store: SessionStore,
+    pool: IngestionPool,
+    job: IngestionJob,
+    description: str,
+    source_path: Path,
+    supported_charts: List[Dict[str, Any]],
+    delete_source: bool,
+) -> None:
+    """Runs the ingestion in the process pool and records the outcome."""
+    try:
+        session_id, session_data = await pool.run(
+            ingest_dataset, description, source_path, supported_charts
+        )
+        await save_new_session(session_store, session_id, session_data)
+        job = job.model_copy(update={"status": "completed", "session_id": session_id})
+        logging.info(f"Ingestion job {job.job_id} created session {session_id}")
+    except Exception as e:
+        logging.error(f"Ingestion job {job.job_id} failed: {e}", exc_info=True)
+        job = job.model_copy(update={"status": "failed", "error": str(e)})
+    finally:
+        if delete_source:
+            source_path.unlink(missing_ok=True)
+
+    await _save_job(session_store, job)
+
+
+async def get_ingestion_job(
+    session_store: SessionStore, job_id: str
+) -> IngestionJob | None:
+    """Retrieves a job, attaching the session data once ingestion has completed."""
+    json_data = await session_store.get_data(f"{JOB_KEY_PREFIX}{job_id}")
+    if not json_data:
+        return None
+
+    job = IngestionJob.model_validate_json(json_data)
+    if job.status == "completed" and job.session_id:
+        job.data = await get_session_data(session_store, job.session_id)
+    return job
@@ -0,0 +1,71 @@
+from typing import List
+import polars as pl
+
+from domains.session.models import ChartMeasure
+
+
+def measure_name(measure: ChartMeasure) -> str:
+    """Returns the output column name of a measure, `<column>_<stat>` by default
+    and `<column>_p<percent>` for quantiles."""
+    if measure.alias:
+        return measure.alias
+    if measure.stat == "quantile":
+        return f"{measure.column}_p{(measure.quantile or 0) * 100:g}"
+    return f"{measure.column}_{measure.stat}"
+
+
+def measure_expression(measure: ChartMeasure) -> pl.Expr:
+    """Builds the per-group expression for a measure."""
+    col = pl.col(measure.column)
+    match measure.stat:
+        case "sum":
+            expr = col.sum()
+        case "mean":
+            expr = col.mean()
+        case "count":
+            expr = col.count()
+        case "min":
+            expr = col.min()
+        case "max":
+            expr = col.max()
+        case "median":
+            expr = col.median()
+        case "std":
+            expr = col.std()
+        case "n_unique":
+            expr = col.drop_nulls().n_unique()
+        case "quantile":
+            expr = col.quantile(measure.quantile)
+    return expr.alias(measure_name(measure))
+
+
+def validate_measures(
+    measures: List[ChartMeasure], schema: pl.Schema, reserved: List[str]
+) -> None:
+    """Checks measures against a dataset schema before any query runs.
+
+    Raises a ValueError when a measure's column is missing, a numeric statistic
+    targets a non-numeric column, a quantile has no `quantile` value, or two
+    output names collide with each other or with `reserved`.
+    """
+    names = set(reserved)
+    for measure in measures:
+        if measure.column not in schema:
+            raise ValueError(f"Measure column '{measure.column}' not found in dataset")
+        dtype = schema[measure.column]
+        if measure.stat in ("sum", "mean", "median", "std", "quantile") and not (
+            dtype.is_numeric()
+        ):
+            raise ValueError(
+                f"Measure `{measure.stat}` needs a numeric column, "
+                f"'{measure.column}' is {dtype}"
+            )
+        if measure.stat == "quantile" and measure.quantile is None:
+            raise ValueError(
+                f"Measure `quantile` on '{measure.column}' needs a `quantile` value"
+            )
+
+        name = measure_name(measure)
+        if name in names:
+            raise ValueError(f"Measure output name '{name}' is already in use")
+        names.add(name)
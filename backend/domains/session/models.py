@@ -1,5 +1,7 @@
-from typing import Any, Dict, List, Literal, Optional
-from pydantic import BaseModel
+from typing import Any, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, Field
+
+from domains.session.resampling import TimeInterval
 
 
 class ColumnInfo(BaseModel):
@@ -10,6 +12,13 @@ class ColumnInfo(BaseModel):
     description: Optional[Dict[str, Any]]
 
 
+class DatasetProfile(BaseModel):
+    """Schema and statistics computed once per stored dataset."""
+
+    columns: List[ColumnInfo]
+    row_count: int
+
+
 class ChatMessage(BaseModel):
     """A single message in the chat history."""
 
@@ -34,6 +43,7 @@ class SessionData(BaseModel):
     columns: List[ColumnInfo]
     file_path: str
     row_count: int
+    dataset_hash: Optional[str] = None
     supported_charts: List[Dict[str, Any]] = []
     chat_history: List[ChatMessage] = []
     analysis_log: List[AnalysisRecord] = []
@@ -46,18 +56,108 @@ class SessionData(BaseModel):
     sampling_method: Optional[str] = None
 
 
+class IngestionJob(BaseModel):
+    """Tracks a dataset ingestion running in the background process pool."""
+
+    job_id: str
+    status: Literal["pending", "completed", "failed"]
+    session_id: Optional[str] = None
+    error: Optional[str] = None
+    data: Optional[SessionData] = None
+
+
 class PreloadedDatasetInfo(BaseModel):
     id: str
     name: str
     description: str
 
 
-class ChartDataPayload(BaseModel):
-    session_id: str
+FilterValue = Union[bool, int, float, str]
+
+
+class ChartFilter(BaseModel):
+    """A predicate on one dataset column.
+
+    Comparisons take a single `value`, `in`/`not_in` a list of values, `between`
+    an inclusive `[lower, upper]` pair and the null checks no value. Dates and
+    datetimes are given as ISO 8601 strings.
+    """
+
+    column: str
+    op: Literal[
+        "eq",
+        "ne",
+        "lt",
+        "lte",
+        "gt",
+        "gte",
+        "in",
+        "not_in",
+        "between",
+        "is_null",
+        "not_null",
+    ]
+    value: Optional[Union[FilterValue, List[FilterValue]]] = None
+
+
+class ChartMeasure(BaseModel):
+    """An extra per-group statistic returned alongside an aggregated chart's y.
+
+    `quantile` is the quantile to compute, between 0 and 1, for the `quantile`
+    statistic. The output column is named `alias`, or after the column and
+    statistic when no alias is given.
+    """
+
+    column: str
+    stat: Literal[
+        "sum",
+        "mean",
+        "count",
+        "min",
+        "max",
+        "median",
+        "std",
+        "n_unique",
+        "quantile",
+    ]
+    quantile: Optional[float] = Field(default=None, ge=0, le=1)
+    alias: Optional[str] = None
+
+
+class ChartDataSpec(BaseModel):
+    """A single chart's selections, on its own or within a batch request.
+
+    `time_interval` sets the resampling bucket for a date/datetime x column,
+    which is chosen automatically when left unset. Rows must match every one of
+    `filters` to be charted. `measures` add statistics of any columns to each
+    group of an aggregated chart, computed in the same pass as `y`.
+    """
+
     chart_type: str
     mapping: Dict[str, Optional[str]]
     sampling_method: Optional[str] = None
     aggregation_method: Optional[str] = None
+    time_interval: Optional[TimeInterval] = None
+    filters: List[ChartFilter] = Field(default=[], max_length=32)
+    measures: List[ChartMeasure] = Field(default=[], max_length=32)
+
+
+class ChartDataPayload(ChartDataSpec):
+    session_id: str
+
+
+class ChartDataBatchPayload(BaseModel):
+    session_id: str
+    charts: List[ChartDataSpec] = Field(min_length=1, max_length=32)
+
+
+class ChartDataRangePayload(BaseModel):
+    session_id: str
+    chart_type: str
+    mapping: Dict[str, Optional[str]]
+    x_start: Optional[float] = None
+    x_end: Optional[float] = None
+    target_points: Optional[int] = Field(default=None, gt=0)
 
 
 class SessionStateUpdatePayload(BaseModel):
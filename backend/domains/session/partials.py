@@ -0,0 +1,142 @@
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Optional
+import polars as pl
+
+from domains.session.datasets import get_partials_dir
+from domains.session.measures import measure_name
+from domains.session.models import ChartMeasure
+
+PARTIAL_ROWS_COL = "__rows"
+
+
+def partial_column_name(value_col: str, stat: str) -> str:
+    """Returns the name of a value column's partial aggregate column."""
+    return f"{value_col}::{stat}"
+
+
+def get_partials_path(dataset_path: Path, group_col: str) -> Path:
+    """Returns where the partial aggregates grouped by a column are stored."""
+    digest = hashlib.sha256(group_col.encode()).hexdigest()[:16]
+    return get_partials_dir(dataset_path) / f"{digest}.arrow"
+
+
+def _is_group_candidate(dtype: pl.DataType) -> bool:
+    return dtype.is_integer() or dtype in (pl.Categorical, pl.String, pl.Boolean)
+
+
+def build_group_partials(dataset_path: Path, max_unique: int) -> List[str]:
+    """Precomputes per-group partial aggregates for a stored dataset.
+
+    Every integer, string, categorical or boolean column with at most
+    `max_unique` distinct values gets its own Arrow file holding, per group, the
+    row count and the sum, non-null count, min, max, mean and M2 (sum of squared
+    deviations from the mean) of every numeric column. All group-bys run as one
+    query plan over a single scan.
+    Returns the columns that were materialized.
+    """
+    lf = pl.scan_ipc(dataset_path)
+    schema = lf.collect_schema()
+
+    candidates = [name for name, dtype in schema.items() if _is_group_candidate(dtype)]
+    if not candidates:
+        return []
+    n_uniques = lf.select([pl.col(name).n_unique() for name in candidates]).collect()
+    group_cols = [name for name in candidates if n_uniques[name][0] <= max_unique]
+    if not group_cols:
+        return []
+
+    numeric_cols = [name for name, dtype in schema.items() if dtype.is_numeric()]
+    queries = []
+    for group_col in group_cols:
+        stat_exprs = []
+        for value_col in numeric_cols:
+            if value_col == group_col:
+                continue
+            col = pl.col(value_col)
+            float_col = col.cast(pl.Float64)
+            stat_exprs += [
+                col.sum().alias(partial_column_name(value_col, "sum")),
+                col.count().alias(partial_column_name(value_col, "count")),
+                col.min().alias(partial_column_name(value_col, "min")),
+                col.max().alias(partial_column_name(value_col, "max")),
+                float_col.mean().alias(partial_column_name(value_col, "mean")),
+                # Deviations from the group mean, not a raw sum of squares, so
+                # variance doesn't cancel when the mean dwarfs the spread
+                ((float_col - float_col.mean()) ** 2)
+                .sum()
+                .alias(partial_column_name(value_col, "m2")),
+            ]
+        queries.append(
+            lf.group_by(group_col).agg(pl.len().alias(PARTIAL_ROWS_COL), *stat_exprs)
+        )
+
+    get_partials_dir(dataset_path).mkdir(exist_ok=True)
+    for group_col, partials in zip(group_cols, pl.collect_all(queries)):
+        partials.write_ipc(
+            get_partials_path(dataset_path, group_col), compression="uncompressed"
+        )
+
+    logging.info(f"Materialized group partials for {len(group_cols)} columns")
+    return group_cols
+
+
+def _partial_stat_expression(
+    stat: str, value_col: str, schema: pl.Schema
+) -> Optional[pl.Expr]:
+    """Rebuilds a per-group statistic of a value column from its partials."""
+    if partial_column_name(value_col, "sum") not in schema:
+        return None
+
+    value_sum = pl.col(partial_column_name(value_col, "sum"))
+    value_count = pl.col(partial_column_name(value_col, "count"))
+    value_m2 = partial_column_name(value_col, "m2")
+    match stat:
+        case "sum" | "count" | "min" | "max":
+            return pl.col(partial_column_name(value_col, stat))
+        case "mean":
+            # Partials from older builds have no stored mean
+            value_mean = partial_column_name(value_col, "mean")
+            if value_mean in schema:
+                return pl.col(value_mean)
+            return pl.when(value_count > 0).then(value_sum / value_count)
+        case "std" if value_m2 in schema:
+            variance = pl.col(value_m2) / (value_count - 1)
+            return pl.when(value_count > 1).then(variance.sqrt())
+        case _:
+            return None
+
+
+def aggregate_from_partials(
+    partials_lf: pl.LazyFrame,
+    method: str,
+    group_col: str,
+    value_col: str,
+    measures: List[ChartMeasure] = [],
+) -> Optional[pl.LazyFrame]:
+    """Answers a sum/mean/count aggregation, and any sum, mean, count, min, max
+    or std measures, from stored partial aggregates.
+
+    The output matches `group_by(group_col).agg(...)` over the raw rows. Returns
+    None when the partials can't answer all of it, such as for a non-numeric
+    value column or a median measure.
+    """
+    schema = partials_lf.collect_schema()
+    if method == "count":
+        agg_expression = pl.col(PARTIAL_ROWS_COL)
+    else:
+        agg_expression = _partial_stat_expression(method, value_col, schema)
+    if agg_expression is None:
+        return None
+
+    measure_exprs = []
+    for measure in measures:
+        measure_expr = _partial_stat_expression(measure.stat, measure.column, schema)
+        if measure_expr is None:
+            return None
+        measure_exprs.append(measure_expr.alias(measure_name(measure)))
+
+    return partials_lf.select(
+        pl.col(group_col), agg_expression.alias(value_col), *measure_exprs
+    )
@@ -0,0 +1,93 @@
+import logging
+from typing import Any, Dict, List, Literal, Tuple
+import polars as pl
+
+ProfileMode = Literal["exact", "approximate"]
+
+PROFILE_QUANTILES = {"25%": 0.25, "50%": 0.5, "75%": 0.75}
+_SAMPLE_SEED = 0
+
+
+def _column_stat_exprs(
+    name: str,
+    dtype: pl.DataType,
+    mode: ProfileMode,
+    sample_size: int,
+    exact_n_unique: bool,
+) -> List[Tuple[str, pl.Expr]]:
+    """Builds the (stat name, expression) pairs profiled for a single column."""
+    col = pl.col(name)
+    stats: List[Tuple[str, pl.Expr]] = [
+        ("count", col.count()),
+        ("null_count", col.null_count()),
+    ]
+
+    if exact_n_unique:
+        stats.append(("n_unique", col.drop_nulls().n_unique()))
+    else:
+        # HyperLogLog can overshoot, but never more distinct values than values
+        stats.append(
+            (
+                "n_unique",
+                pl.min_horizontal(col.drop_nulls().approx_n_unique(), col.count()),
+            )
+        )
+
+    if dtype.is_numeric() or dtype == pl.Boolean:
+        stats.append(("mean", col.mean()))
+    if dtype.is_numeric():
+        stats.append(("std", col.std()))
+    if dtype.is_numeric() or dtype.is_temporal() or dtype in (pl.Boolean, pl.String):
+        stats.append(("min", col.min()))
+        stats.append(("max", col.max()))
+    if dtype.is_numeric():
+        # In approximate mode quantiles come from a fixed-size uniform sample, so
+        # the sort behind them is bounded no matter how many rows there are
+        quantile_source = (
+            col.sample(n=sample_size, seed=_SAMPLE_SEED)
+            if mode == "approximate"
+            else col
+        )
+        for stat_name, quantile in PROFILE_QUANTILES.items():
+            stats.append((stat_name, quantile_source.quantile(quantile)))
+
+    return stats
+
+
+def profile_columns(
+    df: pl.DataFrame, mode: ProfileMode = "approximate", sample_size: int = 100_000
+) -> Dict[str, Dict[str, Any]]:
+    """Computes summary statistics for every column in a single fused query.
+
+    `exact` mode matches `describe()` style exact statistics. `approximate` mode
+    uses HyperLogLog distinct counts and estimates quantiles from a uniform sample
+    of at most `sample_size` rows. Frames of at most `sample_size` rows get exact
+    distinct counts in either mode.
+    """
+    logging.info(f"Profiling {df.width} columns in {mode} mode")
+    exact_n_unique = mode == "exact" or df.height <= sample_size
+    sample_size = min(sample_size, df.height)
+
+    keys: List[Tuple[str, str]] = []
+    exprs: List[pl.Expr] = []
+    for name, dtype in df.schema.items():
+        for stat_name, expr in _column_stat_exprs(
+            name, dtype, mode, sample_size, exact_n_unique
+        ):
+            keys.append((name, stat_name))
+            exprs.append(expr.alias(str(len(exprs))))
+
+    values = df.lazy().select(exprs).collect().row(0) if exprs else ()
+
+    descriptions: Dict[str, Dict[str, Any]] = {name: {} for name in df.columns}
+    for (name, stat_name), value in zip(keys, values):
+        if value is None:
+            continue
+        if isinstance(value, float):
+            descriptions[name][stat_name] = f"{value:.2f}"
+        elif isinstance(value, (int, str, bool)):
+            descriptions[name][stat_name] = value
+        else:
+            descriptions[name][stat_name] = str(value)
+
+    return descriptions
@@ -0,0 +1,159 @@
+import math
+from typing import List, Optional
+import polars as pl
+
+# Finest level has at most 2^16 buckets, coarser levels halve from there
+PYRAMID_MAX_LEVEL = 16
+
+_X_PHYSICAL_COL = "__x"
+_BUCKET_COL = "bucket"
+
+
+class ChartPyramid:
+    """Multi-resolution aggregates of a y column over an x column.
+
+    Level `l` splits the x extent into `2^l` equal-width buckets and keeps the
+    sum of x, sum/min/max of y and the row count of every non-empty bucket,
+    sorted by bucket. The raw points are kept sorted by x as well, so a range
+    query is two binary searches and a slice of the level whose bucket width
+    best matches the requested number of points.
+
+    Temporal x columns are bucketed on their physical value, so range bounds
+    for them are given in the column's underlying integer units.
+    """
+
+    def __init__(self, df: pl.DataFrame, x_col: str, y_col: str) -> None:
+        x_dtype = df.schema[x_col]
+        if not (x_dtype.is_numeric() or x_dtype.is_temporal()):
+            raise ValueError(f"Column '{x_col}' must be numeric or temporal")
+        if not df.schema[y_col].is_numeric():
+            raise ValueError(f"Column '{y_col}' must be numeric")
+
+        self.x_dtype = x_dtype
+        self.points = (
+            df.select(
+                pl.col(x_col).alias("x"),
+                pl.col(y_col).alias("y"),
+                pl.col(x_col).to_physical().cast(pl.Float64).alias(_X_PHYSICAL_COL),
+            )
+            .drop_nulls()
+            .sort(_X_PHYSICAL_COL)
+        )
+
+        physical_x = self.points.get_column(_X_PHYSICAL_COL)
+        self.x_min = physical_x.min() if len(physical_x) else 0.0
+        self.x_max = physical_x.max() if len(physical_x) else 0.0
+        self.max_level = min(
+            PYRAMID_MAX_LEVEL, math.ceil(math.log2(max(len(physical_x), 1)))
+        )
+        self.levels = self._build_levels()
+
+    def _bucket_of(self, x: pl.Expr | float, level: int) -> pl.Expr | int:
+        """Maps a physical x value to its bucket index at a level."""
+        extent = self.x_max - self.x_min
+        bucket_count = 2**level
+        if extent == 0:
+            return x * 0 if isinstance(x, pl.Expr) else 0
+        bucket = (x - self.x_min) * bucket_count / extent
+        if isinstance(bucket, pl.Expr):
+            return bucket.floor().cast(pl.Int64).clip(0, bucket_count - 1)
+        return min(max(math.floor(bucket), 0), bucket_count - 1)
+
+    def _build_levels(self) -> List[pl.DataFrame]:
+        """Aggregates the finest level from the points, then halves it per level."""
+        y = pl.col("y").cast(pl.Float64)
+        level = (
+            self.points.group_by(
+                self._bucket_of(pl.col(_X_PHYSICAL_COL), self.max_level)
+                .cast(pl.Int64)
+                .alias(_BUCKET_COL)
+            )
+            .agg(
+                pl.col(_X_PHYSICAL_COL).sum().alias("x_sum"),
+                y.sum().alias("y_sum"),
+                y.min().alias("y_min"),
+                y.max().alias("y_max"),
+                pl.len().cast(pl.Int64).alias("count"),
+            )
+            .sort(_BUCKET_COL)
+        )
+
+        levels = [level]
+        for _ in range(self.max_level):
+            level = (
+                level.group_by(pl.col(_BUCKET_COL) // 2)
+                .agg(
+                    pl.col("x_sum").sum(),
+                    pl.col("y_sum").sum(),
+                    pl.col("y_min").min(),
+                    pl.col("y_max").max(),
+                    pl.col("count").sum(),
+                )
+                .sort(_BUCKET_COL)
+            )
+            levels.append(level)
+        levels.reverse()
+        return levels
+
+    def estimated_size(self) -> int:
+        """Returns the estimated in-memory size of the points and all levels."""
+        return self.points.estimated_size() + sum(
+            level.estimated_size() for level in self.levels
+        )
+
+    def query(
+        self,
+        x_start: Optional[float],
+        x_end: Optional[float],
+        target_points: int,
+    ) -> pl.DataFrame:
+        """Returns at most about `target_points` rows covering `[x_start, x_end]`.
+
+        Raw points are returned when the range holds no more than
+        `target_points` of them, otherwise one row per bucket of the finest
+        level that fits, with `x` kept within the requested range. Rows have `x`,
+        `y` (the bucket mean), `y_min`, `y_max` and `count` columns either way.
+        """
+        x_start = self.x_min if x_start is None else x_start
+        x_end = self.x_max if x_end is None else x_end
+        target_points = max(target_points, 1)
+
+        physical_x = self.points.get_column(_X_PHYSICAL_COL)
+        start_row = physical_x.search_sorted(x_start, side="left")
+        end_row = physical_x.search_sorted(x_end, side="right")
+        if end_row - start_row <= target_points:
+            return self.points.slice(start_row, max(end_row - start_row, 0)).select(
+                "x",
+                pl.col("y").cast(pl.Float64),
+                pl.col("y").cast(pl.Float64).alias("y_min"),
+                pl.col("y").cast(pl.Float64).alias("y_max"),
+                pl.lit(1, dtype=pl.Int64).alias("count"),
+            )
+
+        extent = self.x_max - self.x_min
+        fraction = (x_end - x_start) / extent if extent > 0 else 1.0
+        level_index = (
+            math.floor(math.log2(target_points / fraction)) if fraction > 0 else 0
+        )
+        level_index = min(max(level_index, 0), self.max_level)
+        level = self.levels[level_index]
+
+        buckets = level.get_column(_BUCKET_COL)
+        start_bucket = buckets.search_sorted(
+            self._bucket_of(x_start, level_index), side="left"
+        )
+        end_bucket = buckets.search_sorted(
+            self._bucket_of(x_end, level_index), side="right"
+        )
+
+        # Edge buckets straddle the range bounds, so their mean x can fall outside
+        mean_x = (pl.col("x_sum") / pl.col("count")).clip(x_start, x_end)
+        if self.x_dtype.is_temporal():
+            mean_x = mean_x.round().cast(pl.Int64).cast(self.x_dtype)
+        return level.slice(start_bucket, max(end_bucket - start_bucket, 0)).select(
+            mean_x.alias("x"),
+            (pl.col("y_sum") / pl.col("count")).alias("y"),
+            "y_min",
+            "y_max",
+            "count",
+        )
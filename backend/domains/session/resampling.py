@@ -0,0 +1,79 @@
+from typing import List, Literal, Optional
+import polars as pl
+
+TimeInterval = Literal["minute", "hour", "day", "week", "month"]
+
+TIME_INTERVALS = {
+    "minute": "1m",
+    "hour": "1h",
+    "day": "1d",
+    "week": "1w",
+    "month": "1mo",
+}
+
+# Candidate intervals for automatic resampling with their approximate length in
+# seconds, finest first
+_AUTO_INTERVALS = [
+    ("1m", 60),
+    ("5m", 300),
+    ("15m", 900),
+    ("30m", 1_800),
+    ("1h", 3_600),
+    ("6h", 21_600),
+    ("12h", 43_200),
+    ("1d", 86_400),
+    ("1w", 604_800),
+    ("1mo", 2_629_746),
+    ("3mo", 7_889_238),
+    ("1y", 31_556_952),
+]
+_SECONDS_PER_DAY = 86_400
+
+
+def is_resampleable(dtype: pl.DataType) -> bool:
+    """Returns whether a column can be resampled into calendar buckets."""
+    return dtype == pl.Date or dtype == pl.Datetime
+
+
+def choose_time_interval(lf: pl.LazyFrame, time_col: str, max_buckets: int) -> str:
+    """Picks the finest calendar interval that splits the column's time span into
+    at most `max_buckets` buckets. Date columns are never split below a day."""
+    span = (
+        lf.select((pl.col(time_col).max() - pl.col(time_col).min()).dt.total_seconds())
+        .collect()
+        .item()
+    )
+    min_seconds = _SECONDS_PER_DAY if lf.collect_schema()[time_col] == pl.Date else 0
+
+    for every, seconds in _AUTO_INTERVALS:
+        if seconds < min_seconds:
+            continue
+        if span is None or span / seconds <= max_buckets:
+            return every
+    return _AUTO_INTERVALS[-1][0]
+
+
+def resample_time_series(
+    lf: pl.LazyFrame,
+    time_col: str,
+    agg_expressions: List[pl.Expr],
+    max_buckets: int,
+    interval: Optional[TimeInterval] = None,
+) -> pl.LazyFrame:
+    """Aggregates a frame into calendar buckets over a Date or Datetime column.
+
+    Buckets are `interval` wide, or the finest interval that keeps the series
+    within `max_buckets` buckets when no interval is given, and are labelled by
+    their start.
+    """
+    every = (
+        TIME_INTERVALS[interval]
+        if interval
+        else choose_time_interval(lf, time_col, max_buckets)
+    )
+    return (
+        lf.drop_nulls(time_col)
+        .sort(time_col)
+        .group_by_dynamic(time_col, every=every)
+        .agg(agg_expressions)
+    )
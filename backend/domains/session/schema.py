@@ -0,0 +1,90 @@
+import logging
+from typing import Any, Dict, List, Tuple
+import polars as pl
+
+SIGNED_INTEGER_DTYPES = [pl.Int8, pl.Int16, pl.Int32, pl.Int64]
+INTEGER_BIT_WIDTHS = {
+    pl.Int8: 8,
+    pl.Int16: 16,
+    pl.Int32: 32,
+    pl.Int64: 64,
+    pl.UInt8: 8,
+    pl.UInt16: 16,
+    pl.UInt32: 32,
+    pl.UInt64: 64,
+}
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+
+def _smallest_integer_dtype(min_value: int, max_value: int) -> pl.DataType | None:
+    """Returns the narrowest signed integer type that can hold the given range."""
+    for dtype in SIGNED_INTEGER_DTYPES:
+        bound = 2 ** (INTEGER_BIT_WIDTHS[dtype] - 1)
+        if -bound <= min_value and max_value < bound:
+            return dtype()
+    return None
+
+
+def compact_dtypes(
+    lf: pl.LazyFrame, categorical_max_unique: int
+) -> Dict[str, pl.DataType]:
+    """Works out narrower dtypes for a frame's columns in a single query.
+
+    Integer columns shrink to the smallest signed width that fits their range,
+    Float64 columns become Float32 only when every value round trips losslessly,
+    and low-cardinality string columns are dictionary encoded as Categorical.
+    Only columns whose dtype would change are returned.
+    """
+    schema = lf.collect_schema()
+
+    checks: List[Tuple[str, str, pl.Expr]] = []
+    for name, dtype in schema.items():
+        col = pl.col(name)
+        if dtype.is_integer() and INTEGER_BIT_WIDTHS.get(dtype, 0) > 8:
+            checks.append((name, "min", col.min()))
+            checks.append((name, "max", col.max()))
+        elif dtype == pl.Float64:
+            lossless = (col.cast(pl.Float32).cast(pl.Float64) == col).all()
+            checks.append((name, "lossless", lossless))
+        elif dtype == pl.String:
+            checks.append((name, "n_unique", col.drop_nulls().n_unique()))
+            checks.append((name, "count", col.count()))
+
+    if not checks:
+        return {}
+
+    row = (
+        lf.select([expr.alias(str(i)) for i, (_, _, expr) in enumerate(checks)])
+        .collect()
+        .row(0)
+    )
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (name, stat_name, _), value in zip(checks, row):
+        stats.setdefault(name, {})[stat_name] = value
+
+    casts: Dict[str, pl.DataType] = {}
+    for name, col_stats in stats.items():
+        dtype = schema[name]
+        if dtype.is_integer():
+            min_value, max_value = col_stats["min"], col_stats["max"]
+            if min_value is None or max_value is None:
+                continue
+            target = _smallest_integer_dtype(int(min_value), int(max_value))
+            if target is not None and (
+                INTEGER_BIT_WIDTHS[target] < INTEGER_BIT_WIDTHS.get(dtype, 64)
+            ):
+                casts[name] = target
+        elif dtype == pl.Float64:
+            if col_stats["lossless"]:
+                casts[name] = pl.Float32()
+        elif dtype == pl.String:
+            n_unique, count = col_stats["n_unique"], col_stats["count"]
+            if (
+                count
+                and n_unique <= categorical_max_unique  # type: ignore
+                and n_unique / count <= CATEGORICAL_MAX_UNIQUE_RATIO  # type: ignore
+            ):
+                casts[name] = pl.Categorical()
+
+    logging.debug(f"Compacting column dtypes: {casts}")
+    return casts
@@ -1,25 +1,90 @@
 import logging
+import math
 import os
+import random
 import yaml
 import uuid
 import json
+import hashlib
 import polars as pl
-from io import BytesIO
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-from pydantic import ValidationError
-
-from domains.session.models import SessionData, ColumnInfo, PreloadedDatasetInfo
-from session_store.base import SessionStore
+from pydantic import BaseModel, ValidationError
+from fastapi.concurrency import run_in_threadpool
+
+from domains.session.models import (
+    SessionData,
+    ChartDataSpec,
+    ChartMeasure,
+    ColumnInfo,
+    DatasetProfile,
+    PreloadedDatasetInfo,
+)
+from domains.session.datasets import (
+    hash_file,
+    acquire_dataset,
+    release_dataset,
+    PINNED_REF_PREFIX,
+)
+from domains.session.cache import CountedLRUCache, file_version_key
+from domains.session.profiling import profile_columns
+from domains.session.schema import compact_dtypes
+from domains.session.downsampling import lttb_downsample, min_max_downsample
+from domains.session.pyramid import ChartPyramid
+from domains.session.binning import bin_2d
+from domains.session.filters import compile_filters
+from domains.session.measures import measure_expression, validate_measures
+from domains.session.partials import (
+    aggregate_from_partials,
+    build_group_partials,
+    get_partials_path,
+)
+from domains.session.resampling import is_resampleable, resample_time_series
+from session_store.base import APPEND_ONLY_FIELDS, SessionStore, VersionConflictError
 from session_store.memory_store import InMemorySessionStore
 from session_store.redis_store import RedisSessionStore
 from core.config import settings
 
 UPLOAD_DIR = Path(__file__).parents[2] / "temp_uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
+UPLOAD_FILE_SUFFIX = ".upload"
+STAGING_FILE_SUFFIX = ".staging"
+
+# Sampling methods whose row choice only depends on the dataset and the seed
+SEEDED_SAMPLING_METHODS = {"random", "stratified", "reservoir"}
+_DATASET_ROW_COL = "__dataset_row"
+_RESERVOIR_ROW_COL = "__reservoir_row"
+
+# Aggregations that reduce each group to one value, also used for resampling
+AGGREGATION_METHODS = {"sum", "mean", "count"}
 
 PRELOADED_DATASET_DIR = Path(__file__).parents[2] / "preloaded_datasets"
 _PRELOADED_DATASET_CACHE: Dict[str, Tuple[Path, PreloadedDatasetInfo]] = {}
+_PRELOADED_DATASET_HASHES: Dict[str, str] = {}
+# Dataframes keyed by file version, bounded by estimated memory
+_DATAFRAME_CACHE: CountedLRUCache[Tuple[str, int], pl.DataFrame] = CountedLRUCache(
+    settings.DATAFRAME_CACHE_MAX_BYTES, getsizeof=lambda df: df.estimated_size()
+)
+# Processed chart data keyed by request version
+_CHART_DATA_CACHE: CountedLRUCache[str, pl.DataFrame] = CountedLRUCache(
+    settings.CHART_DATA_CACHE_MAX_ENTRIES
+)
+# Chart pyramids keyed by dataset version and column pair, bounded by memory
+_CHART_PYRAMID_CACHE: CountedLRUCache[Tuple[str, str, str], ChartPyramid] = (
+    CountedLRUCache(
+        settings.CHART_PYRAMID_CACHE_MAX_BYTES,
+        getsizeof=lambda pyramid: pyramid.estimated_size(),
+    )
+)
+# Sampled row indices keyed by sample parameters
+_SAMPLE_INDEX_CACHE: CountedLRUCache[str, pl.Series] = CountedLRUCache(
+    settings.SAMPLE_INDEX_CACHE_MAX_ENTRIES
+)
+# Parsed sessions keyed by session id and store version. Entries are shared
+# between requests and must not be mutated
+_SESSION_CACHE: CountedLRUCache[Tuple[str, int], SessionData] = CountedLRUCache(
+    settings.SESSION_CACHE_MAX_ENTRIES
+)
 
 
 def initialize_session_store() -> SessionStore:
@@ -90,6 +155,33 @@ def load_preloaded_datasets_into_cache() -> None:
     )
 
 
+def build_preloaded_datasets() -> None:
+    """Converts and profiles every cached preloaded dataset ahead of time.
+
+    Each dataset is stored in the content-addressed dataset store under a pinned
+    reference, so loading one later only has to create the session.
+    """
+    global _PRELOADED_DATASET_HASHES
+    logging.info("Building preloaded dataset artifacts...")
+
+    _PRELOADED_DATASET_HASHES = {}
+    for dataset_id, (data_path, _) in _PRELOADED_DATASET_CACHE.items():
+        try:
+            content_hash = hash_file(data_path)
+            acquire_dataset(
+                content_hash,
+                f"{PINNED_REF_PREFIX}{dataset_id}",
+                lambda path: _build_dataset(data_path, path),
+            )
+            _PRELOADED_DATASET_HASHES[dataset_id] = content_hash
+        except Exception as e:
+            logging.error(f"Failed to build preloaded dataset '{dataset_id}': {e}")
+
+    logging.info(
+        f"Successfully built {len(_PRELOADED_DATASET_HASHES)} preloaded datasets"
+    )
+
+
 def get_all_preloaded_datasets_from_cache() -> List[PreloadedDatasetInfo]:
     return [info for _, info in _PRELOADED_DATASET_CACHE.values()]
 
@@ -101,8 +193,8 @@ def get_preloaded_dataset_by_id(dataset_id: str) -> Tuple[Path, PreloadedDataset
     return _PRELOADED_DATASET_CACHE[dataset_id]
 
 
-def get_df_for_session(session_data: SessionData) -> pl.DataFrame:
-    """Reads a session's CSV from disk into a polars dataframe."""
+def _get_session_file_path(session_data: SessionData) -> Path:
+    """Returns the path of a session's data file, checking that it exists."""
     if not session_data.file_path:
         raise FileNotFoundError("No file path associated with this session.")
 
@@ -110,7 +202,57 @@ def get_df_for_session(session_data: SessionData) -> pl.DataFrame:
     if not file_path.exists():
         raise FileNotFoundError(f"Data file not found at path: {file_path}")
 
-    return pl.read_csv(file_path)
+    return file_path
+
+
+def get_df_for_session(session_data: SessionData) -> pl.DataFrame:
+    """Reads a session's Arrow IPC file into a polars dataframe, going through the
+    in-process dataframe cache first.
+
+    The file is written uncompressed so polars can memory-map it instead of
+    re-parsing, and the schema inferred at upload is preserved as-is.
+    """
+    return get_df_for_session_file(_get_session_file_path(session_data))
+
+
+def get_df_for_session_file(file_path: Path) -> pl.DataFrame:
+    """Reads a session Arrow IPC file by path through the dataframe cache."""
+    key = file_version_key(file_path)
+    df = _DATAFRAME_CACHE.get(key)
+    if df is None:
+        df = pl.read_ipc(file_path)
+        _DATAFRAME_CACHE.put(key, df)
+    return df
+
+
+def scan_df_for_session(session_data: SessionData) -> pl.LazyFrame:
+    """Returns a lazy query root for a session's dataset.
+
+    Files that fit in the dataframe cache budget are served from the cache so
+    repeated chart requests skip disk entirely. Larger files are scanned lazily so
+    only the columns and rows a query actually needs are read.
+    """
+    file_path = _get_session_file_path(session_data)
+
+    if file_path.stat().st_size <= _DATAFRAME_CACHE.max_size:
+        return get_df_for_session(session_data).lazy()
+    return pl.scan_ipc(file_path)
+
+
+def _invalidate_cached_file(file_path: Path) -> None:
+    """Drops every cached version of a dataset file."""
+    _DATAFRAME_CACHE.discard(lambda key: key[0] == str(file_path))
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Returns hit/miss counters and usage of this process's caches."""
+    return {
+        "dataframes": _DATAFRAME_CACHE.stats(),
+        "chart_data": _CHART_DATA_CACHE.stats(),
+        "chart_pyramids": _CHART_PYRAMID_CACHE.stats(),
+        "sample_indices": _SAMPLE_INDEX_CACHE.stats(),
+        "sessions": _SESSION_CACHE.stats(),
+    }
 
 
 def _format_dataset_summary(
@@ -128,36 +270,8 @@ def _format_dataset_summary(
     return summary
 
 
-def _create_column_descriptions(describe_df: pl.DataFrame) -> Dict[str, Dict[str, Any]]:
-    """Transforms the polars describe dataframe to a dictionary."""
-    descriptions = {}
-    stat_names = describe_df.get_column("statistic").to_list()
-
-    for col_name in describe_df.columns[1:]:
-        stat_values = describe_df.get_column(col_name).to_list()
-
-        col_description = {}
-        for stat_name, value in zip(stat_names, stat_values):
-            if value is not None:
-                if isinstance(value, float):
-                    col_description[stat_name] = f"{value:.2f}"
-                else:
-                    col_description[stat_name] = value
-        descriptions[col_name] = col_description
-
-    return descriptions
-
-
-def get_processed_chart_data(
-    session_data: SessionData,
-    chart_type: str,
-    mapping: Dict[str, Optional[str]],
-    aggregation_method: Optional[str],
-    sampling_method: Optional[str],
-) -> List[Dict[str, Any]]:
-    """Loads, processes, and returns data for a chart."""
-    df = get_df_for_session(session_data)
-
+def _get_chart_config(session_data: SessionData, chart_type: str) -> Dict[str, Any]:
+    """Looks up a chart type's configuration in the session."""
     chart_config = next(
         (c for c in session_data.supported_charts if c.get("id") == chart_type), None
     )
@@ -165,143 +279,671 @@ def get_processed_chart_data(
         raise ValueError(
             f"Chart type '{chart_type}' configuration not found in session"
         )
+    return chart_config
 
-    sampling_threshold = chart_config.get("sampling_threshold", 5000)
 
+def _get_mapped_columns(mapping: Dict[str, Optional[str]]) -> Tuple[str, str]:
+    """Returns the x and y columns of a chart mapping."""
     x_col = mapping.get("x") or mapping.get("category")
     y_col = mapping.get("y") or mapping.get("value")
-
     if not x_col or not y_col:
         raise ValueError("Incomplete column mapping provided")
-
-    aggregated_df = apply_aggregation(
-        df.select([x_col, y_col]), aggregation_method, x_col, y_col
+    return x_col, y_col
+
+
+def _get_dataset_version(session_data: SessionData) -> str:
+    """Returns the content hash of a session's dataset, or its path and
+    modification time for sessions created before datasets were hashed."""
+    if session_data.dataset_hash:
+        return session_data.dataset_hash
+    file_path = _get_session_file_path(session_data)
+    return f"{file_path}:{file_path.stat().st_mtime_ns}"
+
+
+def get_chart_data_version(session_data: SessionData, spec: ChartDataSpec) -> str:
+    """Returns a stable hash of a chart request and the dataset version it reads.
+
+    Datasets are content addressed, so the same version always yields the same
+    chart data and the hash can double as the response ETag.
+    """
+    request_key = json.dumps(
+        {
+            "dataset": _get_dataset_version(session_data),
+            "chart_config": _get_chart_config(session_data, spec.chart_type),
+            "spec": spec.model_dump(include=set(ChartDataSpec.model_fields)),
+        },
+        sort_keys=True,
+        default=str,
     )
+    return hashlib.sha256(request_key.encode()).hexdigest()
+
+
+def get_processed_chart_data(
+    session_data: SessionData, spec: ChartDataSpec
+) -> pl.DataFrame:
+    """Returns processed chart data from the result cache, computing it on a miss.
+
+    The result has `x` and `y` columns and is left as a dataframe so it can be
+    encoded in whichever format the client asked for.
+    """
+    version = get_chart_data_version(session_data, spec)
+    chart_data = _CHART_DATA_CACHE.get(version)
+    if chart_data is None:
+        chart_data = _compute_chart_data(session_data, spec)
+        _CHART_DATA_CACHE.put(version, chart_data)
+    return chart_data
+
+
+def _compute_chart_data(session_data: SessionData, spec: ChartDataSpec) -> pl.DataFrame:
+    """Builds a single lazy query for a chart and collects it once."""
+    return _build_chart_query(
+        scan_df_for_session(session_data), session_data, spec
+    ).collect()
+
+
+def get_processed_chart_data_batch(
+    session_data: SessionData, specs: List[ChartDataSpec]
+) -> List[pl.DataFrame]:
+    """Returns processed chart data for several charts from one dataset load.
+
+    Cached results are reused as-is. The remaining charts are planned over a
+    single scan of the dataset and collected together with `pl.collect_all`, so
+    polars can share the scan and any common subplans between them. Identical
+    specs are only computed once.
+    """
+    versions = [get_chart_data_version(session_data, spec) for spec in specs]
+
+    results: Dict[str, pl.DataFrame] = {}
+    pending: Dict[str, ChartDataSpec] = {}
+    for version, spec in zip(versions, specs):
+        if version in results or version in pending:
+            continue
+        chart_data = _CHART_DATA_CACHE.get(version)
+        if chart_data is None:
+            pending[version] = spec
+        else:
+            results[version] = chart_data
+
+    if pending:
+        lf = scan_df_for_session(session_data)
+        queries = [
+            _build_chart_query(lf, session_data, spec) for spec in pending.values()
+        ]
+        for version, chart_data in zip(pending, pl.collect_all(queries)):
+            _CHART_DATA_CACHE.put(version, chart_data)
+            results[version] = chart_data
+
+    return [results[version] for version in versions]
+
+
+def _build_chart_query(
+    lf: pl.LazyFrame, session_data: SessionData, spec: ChartDataSpec
+) -> pl.LazyFrame:
+    """Adds a chart's filters, column selection, aggregation and sampling to a
+    query root.
+
+    Filters come first so polars can push them down into the scan. A Date or
+    Datetime x column is resampled into calendar buckets rather than grouped by
+    exact value, averaging when no aggregation method is chosen.
+    """
+    chart_config = _get_chart_config(session_data, spec.chart_type)
+    predicate = compile_filters(spec.filters, lf.collect_schema())
+    if predicate is not None:
+        lf = lf.filter(predicate)
+    aggregation_method = spec.aggregation_method
+    sampling_method = spec.sampling_method
+
+    sampling_threshold = chart_config.get("sampling_threshold", 5000)
 
-    sampled_df = apply_sampling(
-        aggregated_df, sampling_method, x_col, y_col, target_size=sampling_threshold
+    x_col, y_col = _get_mapped_columns(spec.mapping)
+    columns = [x_col, y_col]
+
+    if spec.measures:
+        if aggregation_method not in AGGREGATION_METHODS and not (
+            aggregation_method is None and is_resampleable(lf.collect_schema()[x_col])
+        ):
+            raise ValueError(
+                "Measures need a sum, mean or count aggregation or a date x axis"
+            )
+        validate_measures(
+            spec.measures, lf.collect_schema(), reserved=[x_col, y_col, "x", "y"]
+        )
+        columns = list(dict.fromkeys(columns + [m.column for m in spec.measures]))
+
+    # Mean 2D binning reads a third, `value` column mapped alongside x and y
+    weight_col = None
+    if aggregation_method == "bin_2d_mean":
+        weight_col = spec.mapping.get("value")
+        if not weight_col or weight_col in (x_col, y_col):
+            raise ValueError(
+                "Aggregation `bin_2d_mean` requires a `value` column mapped "
+                "alongside, and different from, `x` and `y`"
+            )
+        columns.append(weight_col)
+
+    resample = is_resampleable(lf.collect_schema()[x_col]) and (
+        aggregation_method is None or aggregation_method in AGGREGATION_METHODS
     )
+    if resample:
+        aggregated_lf = resample_time_series(
+            lf.select(columns),
+            x_col,
+            [
+                _aggregation_expression(aggregation_method or "mean", y_col),
+                *[measure_expression(measure) for measure in spec.measures],
+            ],
+            max_buckets=sampling_threshold,
+            interval=spec.time_interval,
+        )
+    else:
+        aggregated_lf = _aggregate_from_group_partials(session_data, spec, x_col, y_col)
+        if aggregated_lf is None:
+            aggregated_lf = apply_aggregation(
+                lf.select(columns),
+                aggregation_method,
+                x_col,
+                y_col,
+                grid_size=chart_config.get(
+                    "bin_grid_size", math.isqrt(sampling_threshold)
+                ),
+                weight_col=weight_col,
+                measures=spec.measures,
+            )
 
-    processed_df = sampled_df.rename({x_col: "x", y_col: "y"})
+    if (
+        aggregation_method is None
+        and not resample
+        and sampling_method in SEEDED_SAMPLING_METHODS
+    ):
+        sampled_lf = _sample_dataset_rows(
+            aggregated_lf,
+            session_data,
+            spec,
+            x_col,
+            sampling_threshold,
+        )
+    else:
+        sampled_lf = apply_sampling(
+            aggregated_lf,
+            sampling_method,
+            x_col,
+            y_col,
+            target_size=sampling_threshold,
+            seed=settings.SAMPLING_SEED,
+        )
 
-    return processed_df.to_dicts()
+    return sampled_lf.rename({x_col: "x", y_col: "y"})
+
+
+def _aggregate_from_group_partials(
+    session_data: SessionData, spec: ChartDataSpec, x_col: str, y_col: str
+) -> Optional[pl.LazyFrame]:
+    """Answers a chart's sum, mean or count aggregation from the partial
+    aggregates stored at ingest, without scanning raw rows.
+
+    Returns None when there are no partials for the x column or they can't
+    answer the request. Filtered charts always aggregate the raw rows, since
+    partials cover the whole dataset.
+    """
+    if (
+        spec.aggregation_method not in AGGREGATION_METHODS
+        or spec.filters
+        or x_col == y_col
+    ):
+        return None
+
+    partials_path = get_partials_path(_get_session_file_path(session_data), x_col)
+    if not partials_path.exists():
+        return None
+
+    aggregated_lf = aggregate_from_partials(
+        pl.scan_ipc(partials_path),
+        spec.aggregation_method,
+        x_col,
+        y_col,
+        spec.measures,
+    )
+    if aggregated_lf is not None:
+        logging.info(f"Answering `{spec.aggregation_method}` from `{x_col}` partials")
+    return aggregated_lf
 
 
-def apply_aggregation(
-    df: pl.DataFrame,
-    method: Optional[str],
+def _sample_dataset_rows(
+    lf: pl.LazyFrame,
+    session_data: SessionData,
+    spec: ChartDataSpec,
     category_col: str,
-    value_col: str,
+    target_size: int,
+) -> pl.LazyFrame:
+    """Samples unaggregated dataset rows through the sample index cache.
+
+    Seeded samples of raw rows only depend on the dataset, its filters, the
+    method and, for stratified sampling, the category column. The chosen row
+    indices are cached on those, so a repeat request, even with another y
+    column, gathers the same rows without resampling.
+    """
+    method = spec.sampling_method
+    sample_key = json.dumps(
+        [
+            _get_dataset_version(session_data),
+            [chart_filter.model_dump() for chart_filter in spec.filters],
+            method,
+            category_col if method == "stratified" else None,
+            target_size,
+            settings.SAMPLING_SEED,
+        ]
+    )
+
+    indices = _SAMPLE_INDEX_CACHE.get(sample_key)
+    if indices is None:
+        index_lf = apply_sampling(
+            lf.select(category_col).with_row_index(_DATASET_ROW_COL),
+            method,
+            category_col,
+            category_col,
+            target_size=target_size,
+            seed=settings.SAMPLING_SEED,
+        )
+        indices = (
+            index_lf.select(_DATASET_ROW_COL)
+            .collect(engine="streaming")
+            .get_column(_DATASET_ROW_COL)
+        )
+        _SAMPLE_INDEX_CACHE.put(sample_key, indices)
+
+    return lf.select(pl.all().gather(indices))
+
+
+def get_chart_pyramid(
+    session_data: SessionData, mapping: Dict[str, Optional[str]]
+) -> ChartPyramid:
+    """Returns the multi-resolution pyramid for a mapping, building it on a miss.
+
+    Pyramids are keyed by dataset version, so sessions sharing a dataset share
+    its pyramids too.
+    """
+    x_col, y_col = _get_mapped_columns(mapping)
+    key = (_get_dataset_version(session_data), x_col, y_col)
+
+    pyramid = _CHART_PYRAMID_CACHE.get(key)
+    if pyramid is None:
+        logging.info(f"Building chart pyramid for `{x_col}` / `{y_col}`")
+        df = scan_df_for_session(session_data).select([x_col, y_col]).collect()
+        pyramid = ChartPyramid(df, x_col, y_col)
+        _CHART_PYRAMID_CACHE.put(key, pyramid)
+    return pyramid
+
+
+def get_chart_data_range(
+    session_data: SessionData,
+    chart_type: str,
+    mapping: Dict[str, Optional[str]],
+    x_start: Optional[float],
+    x_end: Optional[float],
+    target_points: Optional[int],
 ) -> pl.DataFrame:
-    """Applies a grouping and aggregation method to a dataframe."""
-    if not method:
-        return df
+    """Answers a zoom/pan request over an x range from the chart pyramid.
+
+    `target_points` defaults to the chart's sampling threshold.
+    """
+    if target_points is None:
+        chart_config = _get_chart_config(session_data, chart_type)
+        target_points = chart_config.get("sampling_threshold", 5000)
+    return get_chart_pyramid(session_data, mapping).query(x_start, x_end, target_points)
 
-    logging.info(f"Applying aggregation method `{method}` to dataframe")
 
+def _aggregation_expression(method: str, value_col: str) -> Optional[pl.Expr]:
+    """Returns the per-group expression for a basic aggregation method."""
     aggregation_map = {
         "sum": pl.sum(value_col).alias(value_col),
         "mean": pl.mean(value_col).alias(value_col),
-        "count": pl.count().alias(value_col),
+        "count": pl.len().alias(value_col),
     }
+    return aggregation_map.get(method)
+
+
+def apply_aggregation(
+    lf: pl.LazyFrame,
+    method: Optional[str],
+    category_col: str,
+    value_col: str,
+    grid_size: int = 64,
+    weight_col: Optional[str] = None,
+    measures: List[ChartMeasure] = [],
+) -> pl.LazyFrame:
+    """Adds a grouping and aggregation step, with any `measures`, to a lazy query."""
+    if not method:
+        return lf
 
-    agg_expression = aggregation_map.get(method)
+    logging.info(f"Applying aggregation method `{method}` to dataframe")
+    match method:
+        # Both columns are numeric axes, reduced to at most `grid_size ** 2` cells
+        case "bin_2d":
+            return bin_2d(lf, category_col, value_col, grid_size)
+        case "bin_2d_mean":
+            return bin_2d(lf, category_col, value_col, grid_size, weight_col)
+
+    agg_expression = _aggregation_expression(method, value_col)
     if agg_expression is None:
         logging.warning(f"Unknown aggregation method `{method}`, skipping.")
-        return df
+        return lf
 
-    return df.group_by(category_col).agg(agg_expression)
+    return lf.group_by(category_col).agg(
+        agg_expression, *[measure_expression(measure) for measure in measures]
+    )
 
 
-# TODO : implement a random seed later
 def apply_sampling(
-    df: pl.DataFrame,
+    lf: pl.LazyFrame,
     method: Optional[str],
     category_col: str,
     value_col: str,
     target_size: int,
     top_n_count: int = 15,
-) -> pl.DataFrame:
-    """Applies a sampling or filtering method to a dataframe."""
-    if not method or df.height <= target_size:
-        return df.head(target_size)
+    seed: int = 0,
+) -> pl.LazyFrame:
+    """Adds a seeded sampling or filtering step to a lazy query."""
+    if not method:
+        return lf.head(target_size)
 
     logging.info(f"Applying sampling method `{method}` to dataframe")
+    # The row count isn't known until the query is collected, so branches are
+    # expressions over `pl.len()` that leave frames within `target_size` untouched
+    within_target = pl.len() <= target_size
+    row_index = pl.int_range(pl.len())
     match method:
         case "top_n":
-            top_n_df = df.sort(value_col, descending=True).head(top_n_count)
-            other_sum = df[value_col].sum() - top_n_df[value_col].sum()
-            if other_sum > 0.001 and df.height > top_n_count:
-                other_df = pl.DataFrame(
-                    {category_col: ["Other"], value_col: [other_sum]}
-                )
-                return pl.concat([top_n_df, other_df])
-            return top_n_df
+            ranked_lf = lf.sort(value_col, descending=True, nulls_last=True)
+            top_n_lf = ranked_lf.filter(within_target | (row_index < top_n_count))
+            other_lf = (
+                ranked_lf.filter(~within_target & (row_index >= top_n_count))
+                .select(pl.lit("Other").alias(category_col), pl.sum(value_col))
+                .filter(pl.col(value_col) > 0.001)
+            )
+            return pl.concat(
+                [top_n_lf.head(target_size), other_lf], how="diagonal_relaxed"
+            )
         case "systematic":
-            step = max(1, df.height // target_size)
-            return df.gather_every(step)
+            step = (pl.len() // target_size).clip(lower_bound=1)
+            return lf.filter(row_index % step == 0)
         case "random":
-            return df.sample(n=min(df.height, target_size))
+            return lf.filter(row_index.shuffle(seed=seed) < target_size)
+        case "stratified":
+            # One systematic pass over a seeded permutation that lays groups out
+            # back to back, each shuffled, picks exactly `target_size` rows and
+            # rounds every group's share up or down
+            fraction = target_size / pl.len()
+            group_start = pl.col(category_col).hash(seed).rank("min") - 1
+            group_rank = row_index.shuffle(seed=seed).over(category_col)
+            position = group_start + group_rank
+            offset = random.Random(seed).random()
+            return lf.filter(
+                within_target
+                | (
+                    ((position + 1) * fraction + offset).floor()
+                    > (position * fraction + offset).floor()
+                )
+            )
+        case "reservoir":
+            # A bounded top-k over seeded row hashes, which streams out of core
+            return (
+                lf.with_row_index(_RESERVOIR_ROW_COL)
+                .bottom_k(target_size, by=pl.col(_RESERVOIR_ROW_COL).hash(seed))
+                .sort(_RESERVOIR_ROW_COL)
+                .drop(_RESERVOIR_ROW_COL)
+            )
+        case "lttb":
+            return lttb_downsample(lf, category_col, value_col, target_size)
+        case "min_max":
+            return min_max_downsample(lf, category_col, value_col, target_size)
         case _:
             logging.warning(
                 f"Unknown sampling method `{method}`, applying default limit."
             )
-            return df.head(target_size)
-
+            return lf.head(target_size)
 
-def create_and_store_session(
-    session_store: SessionStore,
-    description: str,
-    file_contents: bytes,
-    supported_charts: List[Dict[str, Any]],
-) -> Tuple[str, SessionData]:
-    """Processes a dataset, creates session data, and stores it."""
-    session_id = str(uuid.uuid4())
-    df = pl.read_csv(BytesIO(file_contents))
 
-    file_path = UPLOAD_DIR / f"{session_id}.csv"
-    df.write_csv(file_path)
+def _build_dataset(source_path: Path, dataset_path: Path) -> DatasetProfile:
+    """Converts a source CSV into a compact Arrow file and profiles it.
 
-    describe_df = df.describe()
-    all_descriptions = _create_column_descriptions(describe_df)
+    The source CSV is scanned lazily and streamed into a staging Arrow file, so
+    the raw upload is never held in memory as a whole. Columns are then narrowed
+    to compact dtypes while the staging file is streamed into the final file, and
+    per-group partial aggregates are precomputed for low-cardinality columns.
+    """
+    staging_path = dataset_path.with_suffix(STAGING_FILE_SUFFIX)
+    try:
+        pl.scan_csv(source_path, try_parse_dates=True).sink_ipc(
+            staging_path, compression="uncompressed"
+        )
+        staged_lf = pl.scan_ipc(staging_path)
+        casts = compact_dtypes(staged_lf, settings.CATEGORICAL_MAX_UNIQUE)
+        staged_lf.with_columns(
+            [pl.col(name).cast(dtype) for name, dtype in casts.items()]
+        ).sink_ipc(dataset_path, compression="uncompressed")
+    finally:
+        staging_path.unlink(missing_ok=True)
+    build_group_partials(dataset_path, settings.CATEGORICAL_MAX_UNIQUE)
+    df = pl.read_ipc(dataset_path)
+
+    all_descriptions = profile_columns(
+        df, settings.PROFILE_MODE, settings.PROFILE_SAMPLE_SIZE
+    )
 
     columns = [
         ColumnInfo(name=name, dtype=str(dtype), description=all_descriptions.get(name))
         for name, dtype in df.schema.items()
     ]
+    return DatasetProfile(columns=columns, row_count=df.height)
+
 
-    summary_str = _format_dataset_summary(description, df.height, columns)
-    session_data = SessionData(
+def _create_session_data(
+    description: str,
+    content_hash: str,
+    dataset_path: Path,
+    profile: DatasetProfile,
+    supported_charts: List[Dict[str, Any]],
+) -> SessionData:
+    """Creates the data for a new session backed by a stored dataset."""
+    summary_str = _format_dataset_summary(
+        description, profile.row_count, profile.columns
+    )
+    return SessionData(
         summary=summary_str,
-        columns=columns,
-        file_path=str(file_path.resolve()),
-        row_count=df.height,
+        columns=profile.columns,
+        file_path=str(dataset_path.resolve()),
+        row_count=profile.row_count,
+        dataset_hash=content_hash,
         supported_charts=supported_charts,
     )
+
+
+def ingest_dataset(
+    description: str,
+    source_path: Path,
+    supported_charts: List[Dict[str, Any]],
+) -> Tuple[str, SessionData]:
+    """Creates the data for a new session backed by the given source CSV.
+
+    This is CPU bound and runs in the ingestion process pool, so it must not touch
+    the session store or any other per-process state. Datasets are stored by
+    content hash, so identical content is only converted and profiled once.
+    """
+    session_id = str(uuid.uuid4())
+
+    content_hash = hash_file(source_path)
+    dataset_path, profile = acquire_dataset(
+        content_hash,
+        session_id,
+        lambda path: _build_dataset(source_path, path),
+    )
+
+    session_data = _create_session_data(
+        description, content_hash, dataset_path, profile, supported_charts
+    )
+    return session_id, session_data
+
+
+async def create_preloaded_session(
+    session_store: SessionStore,
+    dataset_id: str,
+    supported_charts: List[Dict[str, Any]],
+) -> Tuple[str, SessionData]:
+    """Creates and stores a session backed by a prebuilt preloaded dataset.
+
+    The dataset was converted and profiled by `build_preloaded_datasets`, so this
+    only registers a reference and builds the session data. A dataset that failed
+    to prebuild is built here instead.
+    """
+    session_id, session_data = await run_in_threadpool(
+        _create_preloaded_session_data, dataset_id, supported_charts
+    )
+    await save_new_session(session_store, session_id, session_data)
+    return session_id, session_data
+
+
+def _create_preloaded_session_data(
+    dataset_id: str, supported_charts: List[Dict[str, Any]]
+) -> Tuple[str, SessionData]:
+    """Registers a new session on a preloaded dataset. Blocks on the dataset lock
+    and may hash and build the dataset, so it runs off the event loop."""
+    data_path, info = get_preloaded_dataset_by_id(dataset_id)
+    content_hash = _PRELOADED_DATASET_HASHES.get(dataset_id) or hash_file(data_path)
+
+    session_id = str(uuid.uuid4())
+    dataset_path, profile = acquire_dataset(
+        content_hash,
+        session_id,
+        lambda path: _build_dataset(data_path, path),
+    )
+
+    session_data = _create_session_data(
+        info.description, content_hash, dataset_path, profile, supported_charts
+    )
+    return session_id, session_data
+
+
+async def save_new_session(
+    session_store: SessionStore, session_id: str, session_data: SessionData
+) -> None:
+    """Stores the data for a freshly ingested session."""
     session_data_str = session_data.model_dump_json()
     logging.debug(
         f"Started Session:\n\tID: {session_id}\n\tSession Data: {session_data_str}"
     )
-    session_store.save_data(session_id, session_data_str)
+    await session_store.save_data(session_id, session_data_str)
 
-    return session_id, session_data
 
+async def get_session_data(
+    session_store: SessionStore, session_id: str
+) -> SessionData | None:
+    """Retrieves and parses session data from storage.
 
-def get_session_data(
+    Parsed sessions are cached per process and served for as long as the store
+    reports the same version, which costs one small read instead of fetching and
+    parsing the whole session. The returned session must not be mutated.
+    """
+    _, session_data = await _load_session(session_store, session_id)
+    return session_data
+
+
+async def _load_session(
     session_store: SessionStore, session_id: str
+) -> Tuple[int | None, SessionData | None]:
+    """Reads a session along with the store version it is at least as new as."""
+    version = await session_store.get_version(session_id)
+    if version is not None:
+        session_data = _SESSION_CACHE.get((session_id, version))
+        if session_data is not None:
+            return version, session_data
+
+    json_data = await session_store.get_data(session_id)
+    if not json_data:
+        return version, None
+    session_data = SessionData.model_validate_json(json_data)
+    if version is not None:
+        _SESSION_CACHE.put((session_id, version), session_data)
+    return version, session_data
+
+
+async def update_session_fields(
+    session_store: SessionStore,
+    session_id: str,
+    session_data: SessionData,
+    field_names: List[str],
+    expected_version: int | None = None,
+) -> bool:
+    """Writes only the named top-level fields of a session back to the store.
+
+    Append-only fields can't be overwritten and go through
+    `append_session_items` instead. Returns False if the session no longer
+    exists.
+    """
+    if any(name in APPEND_ONLY_FIELDS for name in field_names):
+        raise ValueError(f"Append-only fields can't be updated: {field_names}")
+    dumped = session_data.model_dump(mode="json", include=set(field_names))
+    fields = {name: json.dumps(value) for name, value in dumped.items()}
+    return await session_store.update_fields(session_id, fields, expected_version)
+
+
+async def update_session(
+    session_store: SessionStore,
+    session_id: str,
+    mutate: Callable[[SessionData], Dict[str, Any]],
+    max_attempts: int = settings.SESSION_UPDATE_MAX_ATTEMPTS,
 ) -> SessionData | None:
-    """Retrieves and parses session data from storage."""
-    json_data = session_store.get_data(session_id)
-    if json_data:
-        return SessionData(**json.loads(json_data))
-    return None
+    """Changes top-level fields of a session with a compare-and-set write.
+
+    `mutate` receives the current session and returns the fields to change. If
+    another request writes the session in between, the change is recomputed
+    against the new state, up to `max_attempts` times before the
+    `VersionConflictError` is raised. Returns the updated session, or None if
+    it doesn't exist.
+    """
+    for attempt in range(1, max_attempts + 1):
+        version, session_data = await _load_session(session_store, session_id)
+        if session_data is None:
+            return None
+
+        update_data = mutate(session_data)
+        updated = session_data.model_copy(update=update_data)
+        try:
+            if not await update_session_fields(
+                session_store, session_id, updated, list(update_data), version
+            ):
+                return None
+            return updated
+        except VersionConflictError:
+            if attempt == max_attempts:
+                raise
+            logging.debug(
+                f"Session {session_id} changed during update, retry {attempt}"
+            )
+
+
+async def append_session_items(
+    session_store: SessionStore, session_id: str, field: str, items: List[BaseModel]
+) -> bool:
+    """Appends entries to a session's chat history or analysis log without
+    rewriting the rest of the session.
+
+    Returns False if the session no longer exists.
+    """
+    encoded = [item.model_dump_json() for item in items]
+    return await session_store.append_items(session_id, field, encoded)
 
 
-def clear_session(session_store: SessionStore, session_id: str) -> None:
-    """Deletes a session from the store and removes its associated data file."""
-    session_data = get_session_data(session_store, session_id)
-    if session_data and session_data.file_path:
+async def clear_session(session_store: SessionStore, session_id: str) -> None:
+    """Deletes a session from the store and releases its associated data file."""
+    session_data = await get_session_data(session_store, session_id)
+    if session_data and session_data.dataset_hash:
+        if await run_in_threadpool(
+            release_dataset, session_data.dataset_hash, session_id
+        ):
+            _invalidate_cached_file(Path(session_data.file_path))
+    elif session_data and session_data.file_path:
         file_path = Path(session_data.file_path)
+        _invalidate_cached_file(file_path)
         if file_path.exists():
             try:
                 os.remove(file_path)
@@ -309,5 +951,6 @@ def clear_session(session_store: SessionStore, session_id: str) -> None:
             except OSError as e:
                 logging.error(f"Error removing file {file_path}: {e}")
 
-    session_store.delete_data(session_id)
+    await session_store.delete_data(session_id)
+    _SESSION_CACHE.discard(lambda key: key[0] == session_id)
     logging.info(f"Cleared session {session_id} from store.")
@@ -1,19 +1,112 @@
+import orjson
 from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
 
 # TODO : Still need a solution to clean orphaned data files
 # Could use redis keyscape notifications subclass TTLCache to override popitem
 # TTLCache operates on a lazy model so cleanups still wouldn't be timely
 # Could also just run cleanup script on a cron job
 
+# Top-level fields of a record that only ever grow, stored as append-only lists
+APPEND_ONLY_FIELDS = ("chat_history", "analysis_log")
+
+
+def split_record(data: str) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """Splits a JSON object into JSON-encoded scalar fields and append-only lists
+    of JSON-encoded items."""
+    record = orjson.loads(data)
+    fields = {
+        name: orjson.dumps(value).decode()
+        for name, value in record.items()
+        if name not in APPEND_ONLY_FIELDS
+    }
+    lists = {
+        name: [orjson.dumps(item).decode() for item in record[name]]
+        for name in APPEND_ONLY_FIELDS
+        if name in record
+    }
+    return fields, lists
+
+
+def join_record(fields: Dict[str, str], lists: Dict[str, List[str]]) -> str:
+    """Reassembles a JSON object from its encoded fields and lists without
+    decoding any of the values."""
+    members = [
+        f"{orjson.dumps(name).decode()}:{value}" for name, value in fields.items()
+    ]
+    members += [
+        f"{orjson.dumps(name).decode()}:[{','.join(items)}]"
+        for name, items in lists.items()
+    ]
+    return "{" + ",".join(members) + "}"
+
+
+class VersionConflictError(Exception):
+    pass
+
+
 class SessionStore(ABC):
     @abstractmethod
-    def save_data(self, session_id: str, data: str):
+    async def save_data(self, session_id: str, data: str):
         pass
 
     @abstractmethod
-    def get_data(self, session_id: str) -> str | None:
+    async def get_data(self, session_id: str) -> str | None:
         pass
 
     @abstractmethod
-    def delete_data(self, session_id: str):
+    async def delete_data(self, session_id: str):
         pass
+
+    async def get_version(self, session_id: str) -> int | None:
+        """Returns a counter that changes on every write to a record, or None if
+        there is no record or the store doesn't track versions."""
+        return None
+
+    async def close(self) -> None:
+        """Releases any connections held by the store."""
+        pass
+
+    async def update_fields(
+        self,
+        session_id: str,
+        fields: Dict[str, str],
+        expected_version: int | None = None,
+    ) -> bool:
+        """Overwrites top-level fields of a stored record with JSON-encoded values.
+
+        With `expected_version`, the write only happens if the record is still at
+        that version and raises a `VersionConflictError` otherwise. Returns False
+        if there is no record. Stores that keep records as whole blobs fall back
+        to a read-modify-write, which is not atomic.
+        """
+        if expected_version is not None:
+            version = await self.get_version(session_id)
+            if version is not None and version != expected_version:
+                raise VersionConflictError(
+                    f"Record {session_id} is at version {version}, "
+                    f"expected {expected_version}"
+                )
+        data = await self.get_data(session_id)
+        if data is None:
+            return False
+        record = orjson.loads(data)
+        record.update({name: orjson.loads(value) for name, value in fields.items()})
+        await self.save_data(session_id, orjson.dumps(record).decode())
+        return True
+
+    async def append_items(self, session_id: str, field: str, items: List[str]) -> bool:
+        """Appends JSON-encoded items to one of a record's `APPEND_ONLY_FIELDS`.
+
+        Returns False if there is no record. Stores that keep records as whole
+        blobs fall back to a read-modify-write.
+        """
+        if field not in APPEND_ONLY_FIELDS:
+            raise ValueError(f"Field '{field}' is not append-only")
+        data = await self.get_data(session_id)
+        if data is None:
+            return False
+        record = orjson.loads(data)
+        record.setdefault(field, []).extend(orjson.loads(item) for item in items)
+        await self.save_data(session_id, orjson.dumps(record).decode())
+        return True
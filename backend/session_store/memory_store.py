@@ -1,17 +1,76 @@
-from session_store.base import SessionStore
+from dataclasses import dataclass
+from typing import Dict, List
+from session_store.base import (
+    APPEND_ONLY_FIELDS,
+    SessionStore,
+    VersionConflictError,
+    split_record,
+    join_record,
+)
 from cachetools import TTLCache
 
 
+@dataclass
+class StoredRecord:
+    fields: Dict[str, str]
+    lists: Dict[str, List[str]]
+    version: int = 1
+
+
 class InMemorySessionStore(SessionStore):
+    """Keeps each record as its encoded fields plus append-only lists, so partial
+    updates and appends only touch what changed."""
+
     def __init__(self) -> None:
-        self._storage: TTLCache[str, str] = TTLCache(maxsize=1024, ttl=360)
+        self._storage: TTLCache[str, StoredRecord] = TTLCache(maxsize=1024, ttl=360)
 
-    def save_data(self, session_id: str, data: str):
-        self._storage[session_id] = data
+    async def save_data(self, session_id: str, data: str):
+        previous = self._storage.get(session_id)
+        record = StoredRecord(*split_record(data))
+        if previous is not None:
+            record.version = previous.version + 1
+        self._storage[session_id] = record
 
-    def get_data(self, session_id: str) -> str | None:
-        return self._storage.get(session_id)
+    async def get_data(self, session_id: str) -> str | None:
+        record = self._storage.get(session_id)
+        return join_record(record.fields, record.lists) if record else None
 
-    def delete_data(self, session_id: str):
+    async def get_version(self, session_id: str) -> int | None:
+        record = self._storage.get(session_id)
+        return record.version if record else None
+
+    async def delete_data(self, session_id: str):
         if session_id in self._storage:
             del self._storage[session_id]
+
+    async def update_fields(
+        self,
+        session_id: str,
+        fields: Dict[str, str],
+        expected_version: int | None = None,
+    ) -> bool:
+        record = self._storage.get(session_id)
+        if record is None:
+            return False
+        # Nothing awaits between the check and the write, so this is atomic
+        if expected_version is not None and record.version != expected_version:
+            raise VersionConflictError(
+                f"Record {session_id} is at version {record.version}, "
+                f"expected {expected_version}"
+            )
+        record.fields.update(fields)
+        record.version += 1
+        # Reassigning refreshes the entry's TTL like a full save would
+        self._storage[session_id] = record
+        return True
+
+    async def append_items(self, session_id: str, field: str, items: List[str]) -> bool:
+        if field not in APPEND_ONLY_FIELDS:
+            raise ValueError(f"Field '{field}' is not append-only")
+        record = self._storage.get(session_id)
+        if record is None:
+            return False
+        record.lists.setdefault(field, []).extend(items)
+        record.version += 1
+        self._storage[session_id] = record
+        return True
@@ -1,18 +1,182 @@
-from redis import Redis
-from session_store.base import SessionStore
+from typing import Dict, List, Optional
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import WatchError
+from session_store.base import (
+    APPEND_ONLY_FIELDS,
+    SessionStore,
+    VersionConflictError,
+    split_record,
+    join_record,
+)
+from session_store.serialization import SessionSerializer
 from core.config import settings
 
+SESSION_TTL_SECONDS = 3600
+
 
 class RedisSessionStore(SessionStore):
-    def __init__(self) -> None:
-        self._client: Redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    """Stores sessions in Redis as a hash of fields plus a list per append-only
+    field, so updates and appends only write what changed."""
+
+    def __init__(
+        self,
+        client: Optional[Redis] = None,
+        serializer: Optional[SessionSerializer] = None,
+    ) -> None:
+        # An injected client must not decode responses, values may be compressed
+        if client is None:
+            pool = ConnectionPool.from_url(
+                settings.REDIS_URL,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            )
+            # The client owns the pool, so closing it disconnects every connection
+            client = Redis.from_pool(pool)
+        self._client = client
+        self._serializer = serializer or SessionSerializer(
+            settings.SESSION_COMPRESSION_MIN_BYTES,
+            settings.SESSION_COMPRESSION_LEVEL,
+        )
+
+    # Scalar fields live in a hash under `session:<id>` and each append-only
+    # field in a list under `session:<id>:<field>`, so an update is one HSET and
+    # an append one RPUSH whatever the size of the session. The counter under
+    # `session:<id>:version` is bumped by every write so other workers can tell
+    # whether a copy they hold is current.
+    @staticmethod
+    def _hash_key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    @staticmethod
+    def _list_key(session_id: str, field: str) -> str:
+        return f"session:{session_id}:{field}"
+
+    @staticmethod
+    def _version_key(session_id: str) -> str:
+        return f"session:{session_id}:version"
+
+    def _data_keys(self, session_id: str) -> List[str]:
+        return [self._hash_key(session_id)] + [
+            self._list_key(session_id, field) for field in APPEND_ONLY_FIELDS
+        ]
+
+    def _all_keys(self, session_id: str) -> List[str]:
+        return self._data_keys(session_id) + [self._version_key(session_id)]
+
+    def _touch(self, pipe, session_id: str) -> None:
+        """Queues a version bump and a TTL refresh on all of a record's keys."""
+        pipe.incr(self._version_key(session_id))
+        for key in self._all_keys(session_id):
+            pipe.expire(key, SESSION_TTL_SECONDS)
+
+    def _dump_fields(self, fields: Dict[str, str]) -> Dict[str, bytes]:
+        # Serialized one by one, so each large value is compressed on its own
+        return {name: self._serializer.dumps(value) for name, value in fields.items()}
+
+    async def save_data(self, session_id: str, data: str):
+        fields, lists = split_record(data)
+        async with self._client.pipeline() as pipe:
+            # The version survives a full save so it keeps increasing
+            pipe.delete(*self._data_keys(session_id))
+            pipe.hset(self._hash_key(session_id), mapping=self._dump_fields(fields))
+            for field, items in lists.items():
+                if items:
+                    pipe.rpush(
+                        self._list_key(session_id, field),
+                        *map(self._serializer.dumps, items),
+                    )
+            self._touch(pipe, session_id)
+            await pipe.execute()
+
+    async def get_data(self, session_id: str) -> str | None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._hash_key(session_id))
+            for field in APPEND_ONLY_FIELDS:
+                pipe.lrange(self._list_key(session_id, field), 0, -1)
+            fields, *list_items = await pipe.execute()
+
+        if not fields:
+            return None
+        lists = {
+            field: [self._serializer.loads(item) for item in items]
+            for field, items in zip(APPEND_ONLY_FIELDS, list_items)
+            if items
+        }
+        return join_record(
+            {
+                name.decode(): self._serializer.loads(value)
+                for name, value in fields.items()
+            },
+            lists,
+        )
+
+    async def get_version(self, session_id: str) -> int | None:
+        version = await self._client.get(self._version_key(session_id))
+        return int(version) if version is not None else None
+
+    async def delete_data(self, session_id: str):
+        await self._client.delete(*self._all_keys(session_id))
+
+    async def close(self) -> None:
+        await self._client.aclose()
 
-    def save_data(self, session_id: str, data: str):
-        self._client.set(session_id, data, ex=3600)
+    async def update_fields(
+        self,
+        session_id: str,
+        fields: Dict[str, str],
+        expected_version: int | None = None,
+    ) -> bool:
+        if expected_version is not None:
+            return await self._compare_and_set_fields(
+                session_id, fields, expected_version
+            )
+        if not await self._client.exists(self._hash_key(session_id)):
+            return False
+        async with self._client.pipeline() as pipe:
+            pipe.hset(self._hash_key(session_id), mapping=self._dump_fields(fields))
+            self._touch(pipe, session_id)
+            await pipe.execute()
+        return True
 
-    def get_data(self, session_id: str) -> str | None:
-        summary = self._client.get(session_id)
-        return str(summary) if summary else None
+    async def _compare_and_set_fields(
+        self, session_id: str, fields: Dict[str, str], expected_version: int
+    ) -> bool:
+        """Writes fields in a MULTI block that only commits if the version key
+        is untouched since it was checked."""
+        version_key = self._version_key(session_id)
+        async with self._client.pipeline() as pipe:
+            try:
+                await pipe.watch(version_key)
+                version = await pipe.get(version_key)
+                if version is None:
+                    return False
+                if int(version) != expected_version:
+                    raise VersionConflictError(
+                        f"Record {session_id} is at version {int(version)}, "
+                        f"expected {expected_version}"
+                    )
+                pipe.multi()
+                pipe.hset(self._hash_key(session_id), mapping=self._dump_fields(fields))
+                self._touch(pipe, session_id)
+                await pipe.execute()
+            except WatchError:
+                raise VersionConflictError(
+                    f"Record {session_id} changed during a conditional update"
+                )
+        return True
 
-    def delete_data(self, session_id: str):
-        self._client.delete(session_id)
+    async def append_items(self, session_id: str, field: str, items: List[str]) -> bool:
+        if field not in APPEND_ONLY_FIELDS:
+            raise ValueError(f"Field '{field}' is not append-only")
+        if not await self._client.exists(self._hash_key(session_id)):
+            return False
+        async with self._client.pipeline() as pipe:
+            if items:
+                pipe.rpush(
+                    self._list_key(session_id, field),
+                    *map(self._serializer.dumps, items),
+                )
+            self._touch(pipe, session_id)
+            await pipe.execute()
+        return True
@@ -0,0 +1,33 @@
+import zstandard
+
+# Leading byte of every stored value, so the encoding can change without
+# migrating sessions that are already stored
+FORMAT_JSON = 1
+FORMAT_ZSTD_JSON = 2
+
+
+class SessionSerializer:
+    """Encodes stored session values as a format byte followed by UTF-8 JSON,
+    zstd-compressed once the JSON reaches `compression_min_bytes`.
+
+    Values stay JSON so reads can go straight into `model_validate_json`. Values
+    written before the format byte existed are read back as plain JSON.
+    """
+
+    def __init__(self, compression_min_bytes: int, compression_level: int = 3) -> None:
+        self._compression_min_bytes = compression_min_bytes
+        self._compressor = zstandard.ZstdCompressor(level=compression_level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def dumps(self, value: str) -> bytes:
+        data = value.encode()
+        if len(data) >= self._compression_min_bytes:
+            return bytes([FORMAT_ZSTD_JSON]) + self._compressor.compress(data)
+        return bytes([FORMAT_JSON]) + data
+
+    def loads(self, blob: bytes) -> str:
+        if blob[:1] == bytes([FORMAT_JSON]):
+            return blob[1:].decode()
+        if blob[:1] == bytes([FORMAT_ZSTD_JSON]):
+            return self._decompressor.decompress(blob[1:]).decode()
+        return blob.decode()
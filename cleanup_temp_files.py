@@ -1,9 +1,14 @@
+import fcntl
 import os
 import time
+from contextlib import contextmanager
 from pathlib import Path
 
 UPLOAD_DIR = Path(__file__).parent / "temp_uploads"
+DATASET_DIR = UPLOAD_DIR / "datasets"
 MAX_FILE_AGE_SECONDS = 21_600
+PINNED_REF_PREFIX = "pinned-"
+SESSION_FILE_SUFFIXES = {".csv", ".arrow", ".upload", ".staging"}
 
 
 def run_cleanup():
@@ -17,7 +22,7 @@ def run_cleanup():
 
     for filename in os.listdir(UPLOAD_DIR):
         file_path = UPLOAD_DIR / filename
-        if file_path.is_file() and file_path.suffix == ".csv":
+        if file_path.is_file() and file_path.suffix in SESSION_FILE_SUFFIXES:
             try:
                 file_age = now - file_path.stat().st_mtime
                 if file_age > MAX_FILE_AGE_SECONDS:
@@ -27,8 +32,101 @@ def run_cleanup():
             except OSError as e:
                 print(f"Error removing file {file_path}: {e}")
 
+    files_removed += cleanup_datasets(now)
+
     print(f"Cleanup complete. Removed {files_removed} files.")
 
 
+@contextmanager
+def _dataset_lock(content_hash: str):
+    """Takes the same per-dataset lock the backend holds while acquiring or
+    releasing a dataset, retrying if the lock file was removed while waiting."""
+    lock_path = DATASET_DIR / f"{content_hash}.lock"
+    while True:
+        lock_file = open(lock_path, "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        lock_file.close()
+
+    try:
+        yield lock_path
+    finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+
+def cleanup_datasets(now: float) -> int:
+    """Drops references from expired sessions, then removes shared datasets that
+    no session refers to anymore along with their lock files."""
+    if not DATASET_DIR.exists():
+        return 0
+
+    content_hashes = {path.name.split(".")[0] for path in DATASET_DIR.iterdir()}
+    files_removed = 0
+    for content_hash in content_hashes:
+        try:
+            with _dataset_lock(content_hash) as lock_path:
+                files_removed += _cleanup_dataset(content_hash, lock_path, now)
+        except OSError as e:
+            print(f"Error cleaning up dataset {content_hash}: {e}")
+
+    return files_removed
+
+
+def _cleanup_dataset(content_hash: str, lock_path: Path, now: float) -> int:
+    """Cleans up one dataset, called while holding its lock."""
+    files_removed = 0
+    # A build holds the lock until its staging file is gone, so one left behind
+    # here is from a build that crashed
+    staging_path = DATASET_DIR / f"{content_hash}.staging"
+    if (
+        staging_path.exists()
+        and now - staging_path.stat().st_mtime > MAX_FILE_AGE_SECONDS
+    ):
+        os.remove(staging_path)
+        print(f"Removed stale staging file: {staging_path.name}")
+        files_removed += 1
+
+    refs_dir = DATASET_DIR / f"{content_hash}.refs"
+    if refs_dir.exists():
+        for ref_path in refs_dir.iterdir():
+            if ref_path.name.startswith(PINNED_REF_PREFIX):
+                continue
+            if now - ref_path.stat().st_mtime > MAX_FILE_AGE_SECONDS:
+                os.remove(ref_path)
+        if any(refs_dir.iterdir()):
+            return files_removed
+
+    dataset_path = DATASET_DIR / f"{content_hash}.arrow"
+    if (
+        dataset_path.exists()
+        and now - dataset_path.stat().st_mtime <= MAX_FILE_AGE_SECONDS
+    ):
+        return files_removed
+
+    staged_removed = files_removed
+    for path in [dataset_path, DATASET_DIR / f"{content_hash}.profile.json"]:
+        if path.exists():
+            os.remove(path)
+            files_removed += 1
+    partials_dir = DATASET_DIR / f"{content_hash}.partials"
+    if partials_dir.exists():
+        for partials_path in partials_dir.iterdir():
+            os.remove(partials_path)
+            files_removed += 1
+        partials_dir.rmdir()
+    if refs_dir.exists():
+        refs_dir.rmdir()
+    # Safe while held, waiters notice the file is gone and lock a new one
+    lock_path.unlink(missing_ok=True)
+    if files_removed > staged_removed:
+        print(f"Removed unreferenced dataset: {content_hash}")
+    return files_removed
+
+
 if __name__ == "__main__":
     run_cleanup()
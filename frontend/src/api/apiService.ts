@@ -6,6 +6,8 @@ import { fetchEventSource } from "@microsoft/fetch-event-source";
 import type {
   InteractionPayload,
   UploadResponse,
+  IngestionJob,
+  ChartDataSpec,
   AnalyzeResponse,
   SessionData,
   SessionStateUpdatePayload,
@@ -20,6 +22,33 @@ import type { SamplingConfig } from "@/config/samplingConfig";
 import type { AggregationConfig } from "@/config/aggregationConfig";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
+const JOB_POLL_INTERVAL_MS = 500;
+
+/**
+ * Polls an ingestion job until it finishes.
+ * @param jobId - The ID returned by the upload endpoint.
+ * @returns A promise that resolves to the new session once ingestion completes.
+ */
+const waitForIngestionJob = async (jobId: string): Promise<UploadResponse> => {
+  for (;;) {
+    const response = await fetch(`${API_BASE_URL}/api/jobs/${jobId}`);
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || "Failed to fetch ingestion status");
+    }
+
+    const job: IngestionJob = await response.json();
+    if (job.status === "completed" && job.session_id && job.data) {
+      return { session_id: job.session_id, data: job.data };
+    }
+    if (job.status === "failed") {
+      throw new Error(job.error || "Failed to process dataset");
+    }
+
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
 
 /**
  * Uploads a dataset to the backend.
@@ -47,7 +76,8 @@ export const uploadDataset = async (
     throw new Error(errorData.detail || "Failed to upload dataset");
   }
 
-  return response.json();
+  const job: IngestionJob = await response.json();
+  return waitForIngestionJob(job.job_id);
 };
 
 export const getPreloadedDatasets = async (): Promise<PreloadedDataset[]> => {
@@ -198,8 +228,15 @@ export const getSessionData = async (
   return response.json();
 };
 
+const chartDataEtagCache = new Map<
+  string,
+  { etag: string; data: Record<string, any>[] }
+>();
+
 /**
  * Fetches processed chart data from the backend.
+ * Responses are remembered by request body so repeat requests can be
+ * revalidated with If-None-Match and answered with a 304.
  */
 export const getChartData = async (
   sessionId: string,
@@ -208,7 +245,79 @@ export const getChartData = async (
   aggregationMethod: AggregationMethods | null,
   samplingMethod: string | null,
 ): Promise<Record<string, any>[]> => {
+  const body = JSON.stringify({
+    session_id: sessionId,
+    chart_type: chartType,
+    mapping,
+    aggregation_method: aggregationMethod,
+    sampling_method: samplingMethod,
+  });
+  const cached = chartDataEtagCache.get(body);
+
   const response = await fetch(`${API_BASE_URL}/api/chart-data`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...(cached ? { "If-None-Match": cached.etag } : {}),
+    },
+    body,
+  });
+
+  if (response.status === 304 && cached) {
+    return cached.data;
+  }
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.detail || "Failed to fetch chart data");
+  }
+
+  const data = await response.json();
+  const etag = response.headers.get("ETag");
+  if (etag) {
+    chartDataEtagCache.set(body, { etag, data });
+  }
+  return data;
+};
+
+/**
+ * Fetches processed chart data for several chart specs in one request.
+ * Results are returned in the same order as the specs.
+ */
+export const getChartDataBatch = async (
+  sessionId: string,
+  charts: ChartDataSpec[],
+): Promise<Record<string, any>[][]> => {
+  const response = await fetch(`${API_BASE_URL}/api/chart-data/batch`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ session_id: sessionId, charts }),
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.detail || "Failed to fetch chart data");
+  }
+
+  return response.json();
+};
+
+/**
+ * Fetches chart data for an x-axis range, for zooming and panning.
+ * Answered from pre-bucketed aggregates, so each row also carries the
+ * bucket's `y_min`, `y_max` and `count`.
+ */
+export const getChartDataRange = async (
+  sessionId: string,
+  chartType: string,
+  mapping: ColumnMapping,
+  xStart: number | null,
+  xEnd: number | null,
+  targetPoints: number | null = null,
+): Promise<Record<string, any>[]> => {
+  const response = await fetch(`${API_BASE_URL}/api/chart-data/range`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
@@ -217,8 +326,9 @@ export const getChartData = async (
       session_id: sessionId,
       chart_type: chartType,
       mapping,
-      aggregation_method: aggregationMethod,
-      samplingMethod: samplingMethod,
+      x_start: xStart,
+      x_end: xEnd,
+      target_points: targetPoints,
     }),
   });
 
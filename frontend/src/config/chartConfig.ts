@@ -60,7 +60,13 @@ export const chartConfigs: ChartConfig[] = [
     description: "Show a trend over time.",
     icon: LineChart,
     sampling_threshold: 500,
-    supported_sampling_methods: ["systematic", "random"],
+    supported_sampling_methods: [
+      "lttb",
+      "min_max",
+      "systematic",
+      "random",
+      "reservoir",
+    ],
     axes: [
       {
         id: "x",
@@ -103,7 +109,13 @@ export const chartConfigs: ChartConfig[] = [
     description: "Show the relationship between two variables.",
     icon: ScatterChart,
     sampling_threshold: 1000,
-    supported_sampling_methods: ["systematic", "random"],
+    supported_sampling_methods: [
+      "systematic",
+      "random",
+      "reservoir",
+      "lttb",
+      "min_max",
+    ],
     axes: [
       {
         id: "x",
@@ -1,7 +1,21 @@
-import { Users, Shuffle, Filter, type LucideProps } from "lucide-react";
+import {
+  Users,
+  Shuffle,
+  Filter,
+  Activity,
+  ArrowUpDown,
+  Database,
+  type LucideProps,
+} from "lucide-react";
 import type { ForwardRefExoticComponent, RefAttributes } from "react";
 
-export type SamplingMethods = "top_n" | "systematic" | "random";
+export type SamplingMethods =
+  | "top_n"
+  | "systematic"
+  | "random"
+  | "reservoir"
+  | "lttb"
+  | "min_max";
 
 type LucideIcon = ForwardRefExoticComponent<
   Omit<LucideProps, "ref"> & RefAttributes<SVGSVGElement>
@@ -36,6 +50,27 @@ export const samplingConfigs: SamplingConfig[] = [
       "Selects a random subset of data points to see the general distribution without performance loss.",
     icon: Shuffle,
   },
+  {
+    id: "reservoir",
+    name: "Reservoir Sampling",
+    description:
+      "Draws a uniform random sample in a single streaming pass, suited to very large datasets.",
+    icon: Database,
+  },
+  {
+    id: "lttb",
+    name: "Shape-Preserving Sampling",
+    description:
+      "Keeps the points that best preserve the visual shape of a line or scatter series (Largest-Triangle-Three-Buckets).",
+    icon: Activity,
+  },
+  {
+    id: "min_max",
+    name: "Min/Max Sampling",
+    description:
+      "Keeps the lowest and highest point in each slice of the X axis so peaks and outliers are never dropped.",
+    icon: ArrowUpDown,
+  },
 ];
 
 export const samplingConfigMap = new Map<string, SamplingConfig>(
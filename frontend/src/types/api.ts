@@ -73,6 +73,59 @@ export interface UploadResponse {
   data: SessionData;
 }
 
+export interface IngestionJob {
+  job_id: string;
+  status: "pending" | "completed" | "failed";
+  session_id?: string | null;
+  error?: string | null;
+  data?: SessionData | null;
+}
+
+export type ChartFilterValue = boolean | number | string;
+
+export interface ChartFilter {
+  column: string;
+  op:
+    | "eq"
+    | "ne"
+    | "lt"
+    | "lte"
+    | "gt"
+    | "gte"
+    | "in"
+    | "not_in"
+    | "between"
+    | "is_null"
+    | "not_null";
+  value?: ChartFilterValue | ChartFilterValue[] | null;
+}
+
+export interface ChartMeasure {
+  column: string;
+  stat:
+    | "sum"
+    | "mean"
+    | "count"
+    | "min"
+    | "max"
+    | "median"
+    | "std"
+    | "n_unique"
+    | "quantile";
+  quantile?: number | null;
+  alias?: string | null;
+}
+
+export interface ChartDataSpec {
+  chart_type: string;
+  mapping: ColumnMapping;
+  aggregation_method?: string | null;
+  sampling_method?: string | null;
+  time_interval?: "minute" | "hour" | "day" | "week" | "month" | null;
+  filters?: ChartFilter[];
+  measures?: ChartMeasure[];
+}
+
 export interface AnalyzeResponse {
   response: string;
   correctness: "correct" | "partially_correct" | "incorrect";